@@ -14,7 +14,7 @@ export interface B1Config {
   b1JThreshold: number;
 }
 import { toast } from 'sonner';
-import { b1SignalService, B1SignalResult, TagItem, StockIndicator } from '@/services/b1SignalService';
+import { b1SignalService, B1SignalResult, TagItem, StockIndicator, StockKLine, stockDetailToRows } from '@/services/b1SignalService';
 import { configService, UserConfig } from '@/services/configService';
 
 interface SignalDetailViewProps {
@@ -35,6 +35,24 @@ const defaultS1Config: S1Config = {
   s1VolumeCondition: true,
 };
 
+// 个股K线每次请求的数量
+const KLINE_PAGE_SIZE = 250;
+
+function toKLineData(item: StockKLine): KLineData {
+  let time = item.time;
+  if (time && /^\d{8}$/.test(time)) {
+    time = `${time.slice(0, 4)}-${time.slice(4, 6)}-${time.slice(6, 8)}`;
+  }
+  return {
+    time,
+    open: item.open ?? 0,
+    high: item.high ?? 0,
+    low: item.low ?? 0,
+    close: item.close ?? 0,
+    volume: item.volume ?? 0,
+  };
+}
+
 export default function SignalDetailView({ 
   signals, 
   type, 
@@ -51,6 +69,9 @@ export default function SignalDetailView({
   const [currentPage, setCurrentPage] = useState(1);
   const [pageSize, setPageSize] = useState(20);
   const [chartLoading, setChartLoading] = useState(false);
+  // K线分页：首屏只取最近 KLINE_PAGE_SIZE 根，向左拖动到头时再取更早的一页
+  const olderCursorRef = useRef<string | null>(null);
+  const loadingOlderRef = useRef(false);
   
   const [config, setConfig] = useState<B1Config | S1Config>(
     type === 'B1' ? defaultB1Config : defaultS1Config
@@ -218,6 +239,7 @@ export default function SignalDetailView({
   // 当选中的股票变化时，更新K线数据
   useEffect(() => {
     const fetchStockDetail = async () => {
+      olderCursorRef.current = null;
       if (!selectedSignal) {
         setKlineData([]);
         setIndicatorData([]);
@@ -229,25 +251,13 @@ export default function SignalDetailView({
         // 从 selectedSignal.id 获取完整的股票代码（包含后缀），因为 code 字段已经去掉了后缀
         const tsCode = selectedSignal.id;
 
-        const response = await b1SignalService.getStockDetail(tsCode);
+        const response = await b1SignalService.getStockDetail(tsCode, { limit: KLINE_PAGE_SIZE });
 
         if (response.success && response.data) {
-          const kline: KLineData[] = response.data.kline.map(item => {
-            let time = item.time;
-            if (time && /^\d{8}$/.test(time)) {
-              time = `${time.slice(0, 4)}-${time.slice(4, 6)}-${time.slice(6, 8)}`;
-            }
-            return {
-              time,
-              open: item.open ?? 0,
-              high: item.high ?? 0,
-              low: item.low ?? 0,
-              close: item.close ?? 0,
-              volume: item.volume ?? 0,
-            };
-          });
-          setKlineData(kline);
-          setIndicatorData(response.data.indicators);
+          const { kline, indicators } = stockDetailToRows(response.data.columns);
+          olderCursorRef.current = response.data.has_more ? response.data.next_end : null;
+          setKlineData(kline.map(toKLineData));
+          setIndicatorData(indicators);
         } else {
           const data = generateKLineData(selectedSignal.price);
           setKlineData(data);
@@ -266,6 +276,28 @@ export default function SignalDetailView({
     fetchStockDetail();
   }, [selectedSignal]);
 
+  // 加载更早的一页K线，拼接在已有数据之前
+  const loadOlderKline = useCallback(async () => {
+    const end = olderCursorRef.current;
+    if (!selectedSignal || !end || loadingOlderRef.current) return;
+
+    loadingOlderRef.current = true;
+    const tsCode = selectedSignal.id;
+    try {
+      const response = await b1SignalService.getStockDetail(tsCode, { end, limit: KLINE_PAGE_SIZE });
+      // 加载期间切换了股票时丢弃结果
+      if (!response.success || !response.data || olderCursorRef.current !== end) return;
+      const { kline, indicators } = stockDetailToRows(response.data.columns);
+      olderCursorRef.current = response.data.has_more ? response.data.next_end : null;
+      setKlineData(prev => [...kline.map(toKLineData), ...prev]);
+      setIndicatorData(prev => [...indicators, ...prev]);
+    } catch (error) {
+      console.error('获取更早的K线失败:', error);
+    } finally {
+      loadingOlderRef.current = false;
+    }
+  }, [selectedSignal]);
+
   const handleSelectSignal = (signal: StockSignal) => {
     setSelectedSignal(signal);
   };
@@ -373,6 +405,7 @@ export default function SignalDetailView({
                 d: selectedSignal.d_value ?? 0,
               } : undefined}
               indicators={indicatorData}
+              onLoadMore={loadOlderKline}
             />
           </div>
         </div>
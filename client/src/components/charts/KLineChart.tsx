@@ -33,9 +33,14 @@ interface KLineChartProps {
   entryDate?: string;
   kdjValues?: { j: number; k: number; d: number };
   indicators?: StockIndicator[];
+  onLoadMore?: () => void; // 拖动到最左侧时加载更早的K线
 }
 
-export default function KLineChart({ data, stockName, stockCode, entryDate, kdjValues: propsKdjValues, indicators }: KLineChartProps) {
+// 首屏显示的K线数量；距离最左侧不足 LOAD_MORE_THRESHOLD 根时触发 onLoadMore
+const INITIAL_VISIBLE_BARS = 120;
+const LOAD_MORE_THRESHOLD = 5;
+
+export default function KLineChart({ data, stockName, stockCode, entryDate, kdjValues: propsKdjValues, indicators, onLoadMore }: KLineChartProps) {
   const mainChartRef = useRef<HTMLDivElement>(null);
   const volumeChartRef = useRef<HTMLDivElement>(null);
   const kdjChartRef = useRef<HTMLDivElement>(null);
@@ -44,6 +49,10 @@ export default function KLineChart({ data, stockName, stockCode, entryDate, kdjV
   const kdjChart = useRef<IChartApi | null>(null);
   const [isLoading, setIsLoading] = useState(true);
   const [kdjValues, setKdjValues] = useState<{ k: number; d: number; j: number } | null>(null);
+  // 重建图表前的可视区间（距右端的K线数 + 宽度），向前加载后保持同一段K线可见
+  const viewRef = useRef<{ code?: string; rightOffset: number; span: number } | null>(null);
+  const onLoadMoreRef = useRef(onLoadMore);
+  onLoadMoreRef.current = onLoadMore;
 
   useEffect(() => {
     if (!mainChartRef.current || !volumeChartRef.current || !kdjChartRef.current || data.length === 0) return;
@@ -283,10 +292,27 @@ export default function KLineChart({ data, stockName, stockCode, entryDate, kdjV
 
     syncTimeScales();
 
-    // 自适应宽度
-    mainChart.current.timeScale().fitContent();
-    volumeChart.current.timeScale().fitContent();
-    kdjChart.current.timeScale().fitContent();
+    // 可视区间：同一只股票加载更早数据后保持原位置，否则显示最近 INITIAL_VISIBLE_BARS 根
+    const view = viewRef.current && viewRef.current.code === stockCode ? viewRef.current : null;
+    if (view) {
+      const to = data.length - view.rightOffset;
+      mainChart.current.timeScale().setVisibleLogicalRange({ from: to - view.span, to });
+    } else if (data.length > INITIAL_VISIBLE_BARS) {
+      mainChart.current.timeScale().setVisibleLogicalRange({ from: data.length - INITIAL_VISIBLE_BARS, to: data.length });
+    } else {
+      mainChart.current.timeScale().fitContent();
+      volumeChart.current.timeScale().fitContent();
+      kdjChart.current.timeScale().fitContent();
+    }
+
+    const dataLength = data.length;
+    mainChart.current.timeScale().subscribeVisibleLogicalRangeChange(range => {
+      if (!range) return;
+      viewRef.current = { code: stockCode, rightOffset: dataLength - range.to, span: range.to - range.from };
+      if (range.from < LOAD_MORE_THRESHOLD) {
+        onLoadMoreRef.current?.();
+      }
+    });
 
     setIsLoading(false);
 
@@ -104,16 +104,70 @@ export interface StockIndicator {
   j: number | null;
 }
 
+// 个股详情按列返回：每个字段一个数组，下标对应同一根K线
+export interface StockDetailColumns {
+  time: string[];
+  open: (number | null)[];
+  high: (number | null)[];
+  low: (number | null)[];
+  close: (number | null)[];
+  pct_chg: (number | null)[];
+  volume: (number | null)[];
+  ma5: (number | null)[];
+  ma10: (number | null)[];
+  k: (number | null)[];
+  d: (number | null)[];
+  j: (number | null)[];
+}
+
 export interface StockDetailResponse {
   success: boolean;
   data: {
     ts_code: string;
-    kline: StockKLine[];
-    indicators: StockIndicator[];
+    count: number;
+    has_more: boolean;       // 是否还有更早的K线
+    next_end: string | null; // 向前翻页时作为 end 传入
+    latest: string | null;   // 增量刷新时作为 since 传入
+    columns: StockDetailColumns;
   } | null;
   message?: string;
 }
 
+export interface StockDetailQuery {
+  start?: string;  // YYYYMMDD，含
+  end?: string;    // YYYYMMDD，含
+  limit?: number;  // 最近N根K线
+  since?: string;  // YYYYMMDD，不含
+}
+
+/** 按列数据转为K线/指标两组记录 */
+export function stockDetailToRows(columns: StockDetailColumns): { kline: StockKLine[]; indicators: StockIndicator[] } {
+  const kline: StockKLine[] = [];
+  const indicators: StockIndicator[] = [];
+  for (let i = 0; i < columns.time.length; i++) {
+    const time = columns.time[i];
+    kline.push({
+      time,
+      open: columns.open[i],
+      high: columns.high[i],
+      low: columns.low[i],
+      close: columns.close[i],
+      pct_chg: columns.pct_chg[i],
+      volume: columns.volume[i],
+    });
+    indicators.push({
+      time,
+      ma5: columns.ma5[i],
+      ma10: columns.ma10[i],
+      volume: columns.volume[i],
+      k: columns.k[i],
+      d: columns.d[i],
+      j: columns.j[i],
+    });
+  }
+  return { kline, indicators };
+}
+
 export interface LatestTradeDateResponse {
   success: boolean;
   latest_trade_date: string | null;
@@ -228,8 +282,13 @@ export const b1SignalService = {
     return response.json();
   },
 
-  async getStockDetail(code: string): Promise<StockDetailResponse> {
-    const response = await fetch(`${API_BASE_URL}/b1-signal/stock-detail?code=${encodeURIComponent(code)}`);
+  async getStockDetail(code: string, query: StockDetailQuery = {}): Promise<StockDetailResponse> {
+    const params = new URLSearchParams({ code });
+    if (query.start) params.append('start', query.start);
+    if (query.end) params.append('end', query.end);
+    if (query.limit) params.append('limit', String(query.limit));
+    if (query.since) params.append('since', query.since);
+    const response = await fetch(`${API_BASE_URL}/b1-signal/stock-detail?${params.toString()}`);
     if (!response.ok) {
       throw new Error('Failed to fetch stock detail');
     }
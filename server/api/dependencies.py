@@ -1,27 +1,42 @@
-from fastapi import Depends, HTTPException, Header
-from typing import Optional
-from core.database import get_db
+import hashlib
+import logging
+import time
+from datetime import date, datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import Depends, HTTPException, Header, Request, Response
+from typing import Optional, Tuple
+from core.cache import user_principal_cache, cached_response, data_version
+from core.database import db_connection
 from core.security import verify_token
 from core.config import settings
 
-async def get_current_user(authorization: Optional[str] = Header(None), db=Depends(get_db)):
+async def get_current_user(authorization: Optional[str] = Header(None)):
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="未授权")
-    
+
     token = authorization.split(" ")[1]
     payload = verify_token(token)
-    
+
     if not payload:
         raise HTTPException(status_code=401, detail="无效token")
-    
-    async with db.cursor() as cursor:
-        await cursor.execute("SELECT * FROM users WHERE id = %s", (int(payload["sub"]),))
-        row = await cursor.fetchone()
-        if not row:
-            raise HTTPException(status_code=401, detail="用户不存在")
-        await cursor.execute("DESC users")
-        columns = [col[0] for col in await cursor.fetchall()]
-        return dict(zip(columns, row))
+
+    sub = str(payload["sub"])
+    user = user_principal_cache.get(sub)
+    if user is not None:
+        return dict(user)
+
+    # 缓存未命中时才从连接池取连接
+    async with db_connection() as db:
+        async with db.cursor() as cursor:
+            await cursor.execute("SELECT * FROM users WHERE id = %s", (int(sub),))
+            row = await cursor.fetchone()
+            if not row:
+                raise HTTPException(status_code=401, detail="用户不存在")
+            columns = [col[0] for col in cursor.description]
+            user = dict(zip(columns, row))
+
+    user_principal_cache.set(sub, user)
+    return dict(user)
 
 async def require_admin(current_user: dict = Depends(get_current_user)):
     if current_user["role"] != "admin":
@@ -30,3 +45,70 @@ async def require_admin(current_user: dict = Depends(get_current_user)):
 
 def get_db_config() -> dict:
     return settings.db_config
+
+
+logger = logging.getLogger(__name__)
+
+# 进程启动标识：重启后数据版本号从0开始，避免与重启前签发的ETag冲突
+_BOOT_ID = f"{time.time():.6f}"
+
+# 最近一次数据写入时间：落库日志、B1结果（均走索引，结果按数据版本缓存）
+DATA_STAMP_SQL = """
+SELECT
+    (SELECT MAX(created_at) FROM data_integration_log) AS integrated_at,
+    (SELECT MAX(updated_at) FROM b1_signal_results
+     WHERE trade_date = (SELECT MAX(trade_date) FROM b1_signal_results)) AS b1_updated_at
+"""
+
+
+async def _load_data_stamp() -> Tuple[str, Optional[datetime]]:
+    async with db_connection() as db:
+        async with db.cursor() as cursor:
+            await cursor.execute(DATA_STAMP_SQL)
+            row = await cursor.fetchone()
+    times = [value for value in (row or ()) if value is not None]
+    last_modified = max(times) if times else None
+    return '|'.join(str(value) for value in (row or ())), last_modified
+
+
+async def conditional_get(request: Request, response: Response):
+    """
+    条件GET：按数据版本和最近一次数据写入时间生成 ETag / Last-Modified
+
+    If-None-Match（或 If-Modified-Since）匹配时直接返回304，不执行接口查询也不序列化响应体。
+    数据写入时间的查询结果随响应缓存按数据版本缓存，每个版本只查询一次。
+    """
+    if not settings.CONDITIONAL_GET_ENABLED:
+        return
+
+    try:
+        stamp, last_modified = await cached_response('data-stamp', {}, _load_data_stamp)
+    except Exception as e:
+        # 取不到数据写入时间时不做条件GET，正常返回完整响应
+        logger.warning(f"获取数据写入时间失败，跳过ETag: {str(e)}")
+        return
+    version, trade_date = data_version()
+    # 含当天日期：按"今日"统计的接口（如 /market/signal-distribution）跨过零点后ETag随之变化
+    seed = '|'.join([_BOOT_ID, str(version), str(trade_date), date.today().isoformat(), stamp, request.url.path,
+                     '&'.join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))])
+    etag = f'W/"{hashlib.sha1(seed.encode("utf-8")).hexdigest()[:20]}"'
+
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+    if last_modified is not None:
+        # MySQL TIMESTAMP 以服务器本地时间返回
+        headers['Last-Modified'] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+        if '*' in tags or etag.removeprefix('W/') in tags:
+            raise HTTPException(status_code=304, headers=headers)
+    elif last_modified is not None and request.headers.get('if-modified-since'):
+        try:
+            since = parsedate_to_datetime(request.headers['if-modified-since'])
+            if last_modified.astimezone(timezone.utc).replace(microsecond=0) <= since:
+                raise HTTPException(status_code=304, headers=headers)
+        except (TypeError, ValueError):
+            pass
+
+    response.headers.update(headers)
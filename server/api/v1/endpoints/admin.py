@@ -3,6 +3,7 @@ from pydantic import BaseModel
 from typing import Optional, Dict, Any
 from datetime import datetime, timedelta
 from core.database import get_db
+from core.cache import bump_data_version
 from api.dependencies import require_admin
 
 router = APIRouter()
@@ -161,6 +162,7 @@ async def add_tag_config(
             )
         )
         await db.commit()
+        bump_data_version()
 
         return {"success": True, "message": "标签添加成功"}
 
@@ -215,6 +217,7 @@ async def update_tag_config(
             tuple(values)
         )
         await db.commit()
+        bump_data_version()
 
         return {"success": True, "message": "标签更新成功"}
 
@@ -232,6 +235,7 @@ async def delete_tag_config(
             (tag_id,)
         )
         await db.commit()
+        bump_data_version()
 
         return {"success": True, "message": "标签删除成功"}
 
@@ -1,5 +1,8 @@
-from fastapi import APIRouter, HTTPException, Query, Response, Cookie
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, Cookie
 from core.database import get_sync_connection
+from core.cache import cached_response
+from api.dependencies import conditional_get
+from core.executor import b1_executor
 from typing import Optional
 import pymysql
 
@@ -21,8 +24,17 @@ async def logout(response: Response):
     return {"success": True}
 
 
-@router.get("/latest-trade")
+@router.get("/latest-trade", dependencies=[Depends(conditional_get)])
 async def get_latest_trade_date():
+    try:
+        return await cached_response('latest-trade', {}, lambda: b1_executor.run(_query_latest_trade_date))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+def _query_latest_trade_date():
     conn = None
     try:
         conn = get_sync_connection()
@@ -40,9 +52,6 @@ async def get_latest_trade_date():
             return {'success': True, 'latest_trade_date': formatted_date}
         else:
             return {'success': True, 'latest_trade_date': None, 'message': '暂无交易数据'}
-            
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
     finally:
         if conn:
             conn.close()
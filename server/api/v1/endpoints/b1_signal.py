@@ -1,8 +1,15 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from pydantic import BaseModel
 from typing import List, Optional
 from services.b1_signal_service import B1SignalService
+from core.config import settings
 from core.database import get_sync_connection
+from core.executor import b1_executor
+from core.responses import FastJSONResponse, dumps
+from core.cache import (
+    cached_response, bump_data_version, data_version, response_cache, response_cache_key, stock_detail_cache
+)
+from api.dependencies import conditional_get
 from utils.logger import setup_logger
 import pymysql
 import json
@@ -42,76 +49,111 @@ class SaveThresholdRequest(BaseModel):
     threshold_value: float
 
 
-@router.post("/filter-and-tag")
-async def filter_and_tag(request: B1FilterRequest):
+def _run_filter_and_tag(request: B1FilterRequest):
     service = B1SignalService()
     try:
         service.connect()
-        result = service.filter_and_tag(
+        return service.filter_and_tag(
             trade_date=request.trade_date,
             custom_tags=request.custom_tags,
             ts_codes=request.ts_codes,
             save_to_db=request.save_to_db,
-            force_refresh_cache=False,
             j_threshold=request.j_threshold,
             macd_dif_threshold=request.macd_dif_threshold
         )
-        return result
+    finally:
+        service.close()
+
+
+@router.post("/filter-and-tag", response_class=FastJSONResponse)
+async def filter_and_tag(request: B1FilterRequest):
+    try:
+        result = await b1_executor.run(_run_filter_and_tag, request)
+        if request.save_to_db:
+            bump_data_version()
+        return FastJSONResponse(result)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"B1信号过滤打标签失败: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
+
+
+def _run_get_all_tags():
+    service = B1SignalService()
+    try:
+        service.connect()
+        return service.get_all_tags()
     finally:
         service.close()
 
 
-@router.get("/tags")
+async def _load_all_tags():
+    all_tags = await b1_executor.run(_run_get_all_tags)
+    return {'success': True, 'data': all_tags}
+
+
+@router.get("/tags", dependencies=[Depends(conditional_get)])
 async def get_available_tags():
-    service = B1SignalService()
     try:
-        service.connect()
-        all_tags = service.get_all_tags()
-        return {'success': True, 'data': all_tags}
+        return await cached_response('b1-tags', {}, _load_all_tags)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"获取标签列表失败: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
+
+
+def _run_save_tag_config(request: SaveTagsConfigRequest):
+    service = B1SignalService()
+    try:
+        service.connect()
+        tags_data = [{"id": t.id, "is_enabled": t.is_enabled, "threshold_value": t.threshold_value} for t in request.tags]
+        return service.save_tag_config(tags_data, request.user_id)
     finally:
         service.close()
 
 
 @router.post("/save-tag-config")
 async def save_tag_config(request: SaveTagsConfigRequest):
-    service = B1SignalService()
     try:
-        service.connect()
-        tags_data = [{"id": t.id, "is_enabled": t.is_enabled, "threshold_value": t.threshold_value} for t in request.tags]
-        result = service.save_tag_config(tags_data, request.user_id)
+        result = await b1_executor.run(_run_save_tag_config, request)
+        bump_data_version()
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"保存标签配置失败: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
+
+
+def _run_save_threshold(request: SaveThresholdRequest):
+    service = B1SignalService()
+    try:
+        service.connect()
+        return service.save_threshold(request.tag_code, request.threshold_value)
     finally:
         service.close()
 
 
 @router.post("/save-threshold")
 async def save_threshold(request: SaveThresholdRequest):
-    service = B1SignalService()
     try:
-        service.connect()
-        result = service.save_threshold(request.tag_code, request.threshold_value)
+        result = await b1_executor.run(_run_save_threshold, request)
+        bump_data_version()
         return result
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"保存阈值失败: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        service.close()
 
 
 @router.post("/clear-cache")
 async def clear_stock_cache():
     try:
-        B1SignalService.clear_cache()
-        return {'success': True, 'message': '缓存已清除'}
+        version = bump_data_version()
+        return {'success': True, 'message': '缓存已清除', 'data_version': version}
     except Exception as e:
         logger.error(f"清除缓存失败: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -120,102 +162,165 @@ async def clear_stock_cache():
 @router.get("/cache-info")
 async def get_cache_info():
     try:
-        is_valid = B1SignalService._is_cache_valid()
-        
-        if is_valid:
-            stock_count = len(B1SignalService._stock_list_cache) if B1SignalService._stock_list_cache else 0
-            expire_time = B1SignalService._cache_expire_time.strftime('%Y-%m-%d %H:%M:%S')
-            return {
-                'success': True,
-                'cached': True,
-                'stock_count': stock_count,
-                'expire_time': expire_time
-            }
-        else:
-            return {
-                'success': True,
-                'cached': False,
-                'message': '缓存已过期或未初始化'
-            }
+        version, trade_date = data_version()
+        return {
+            'success': True,
+            'data_version': version,
+            'trade_date': trade_date,
+            'caches': [response_cache.stats(), stock_detail_cache.stats()]
+        }
     except Exception as e:
         logger.error(f"获取缓存信息失败: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/results")
-async def get_b1_signal_results(
-    trade_date: Optional[str] = Query(None),
-    page: int = Query(1, ge=1),
-    page_size: int = Query(20, ge=1, le=100),
-    j_value: Optional[int] = Query(None, description="J值阈值过滤"),
-    matched_tag_codes: Optional[str] = Query(None, description="标签过滤，逗号分隔")
-):
+# 列表页需要的列（不含 trigger_condition/created_at 等大字段或无用字段）
+B1_RESULT_LIST_COLUMNS = (
+    'id', 'ts_code', 'stock_name', 'trade_date', 'signal_strength',
+    'close_price', 'open_price', 'high_price', 'low_price', 'price_change', 'pct_change',
+    'volume', 'amount', 'volume_ratio', 'turnover_rate',
+    'j_value', 'k_value', 'd_value', 'macd_dif', 'macd_dea', 'macd_value',
+    'total_mv', 'circ_mv', 'industry', 'area', 'trigger_time', 'display_factor',
+    'matched_tag_ids', 'matched_tag_names', 'matched_tag_codes',
+    'plus_tags_count', 'minus_tags_count', 'tag_score'
+)
+B1_RESULT_JSON_COLUMNS = ('matched_tag_ids', 'matched_tag_names', 'matched_tag_codes')
+
+
+def _has_tag_index(cursor, trade_date) -> bool:
+    """该交易日是否已写入 b1_signal_tag_index"""
+    cursor.execute("SELECT 1 AS hit FROM b1_signal_tag_index WHERE trade_date = %s LIMIT 1", [trade_date])
+    return cursor.fetchone() is not None
+
+
+def _query_b1_signal_results(trade_date: Optional[str], page: int, page_size: int,
+                             j_value: Optional[int], matched_tag_codes: Optional[str]):
+    """
+    分页查询B1信号结果：过滤、计数、排序和分页全部在MySQL中完成，只反序列化当前页
+    """
     conn = None
     try:
         conn = get_sync_connection()
         cursor = conn.cursor(pymysql.cursors.DictCursor)
 
-        if trade_date:
-            sql = "SELECT * FROM b1_signal_results WHERE trade_date = %s ORDER BY tag_score DESC, volume_ratio DESC"
-            params = [trade_date]
-        else:
-            sql = "SELECT * FROM b1_signal_results WHERE trade_date = (SELECT MAX(trade_date) FROM b1_signal_results) ORDER BY tag_score DESC, volume_ratio DESC"
-            params = []
+        if not trade_date:
+            cursor.execute("SELECT MAX(trade_date) AS trade_date FROM b1_signal_results")
+            trade_date = cursor.fetchone()['trade_date']
+            if trade_date is None:
+                cursor.close()
+                return {'success': True, 'total': 0, 'data': [], 'page': page, 'page_size': page_size}
 
-        cursor.execute(sql, params)
-        results = cursor.fetchall()
-
-        for row in results:
-            if row.get('matched_tag_ids'):
-                row['matched_tag_ids'] = json.loads(row['matched_tag_ids'])
-            if row.get('matched_tag_names'):
-                row['matched_tag_names'] = json.loads(row['matched_tag_names'])
-            if row.get('matched_tag_codes'):
-                row['matched_tag_codes'] = json.loads(row['matched_tag_codes'])
+        where = "WHERE trade_date = %s"
+        params = [trade_date]
 
         if j_value is not None:
-            results = [row for row in results if row.get('j_value', 0) < j_value]
+            where += " AND j_value < %s"
+            params.append(j_value)
 
         if matched_tag_codes:
             from urllib.parse import unquote
-            tag_list = unquote(matched_tag_codes).split(',')
-            results = [
-                row for row in results
-                if not row.get('matched_tag_codes') or not any(
-                    tag in row['matched_tag_codes'] for tag in tag_list
+            tag_list = [tag for tag in unquote(matched_tag_codes).split(',') if tag]
+            if tag_list and _has_tag_index(cursor, trade_date):
+                where += (
+                    " AND NOT EXISTS (SELECT 1 FROM b1_signal_tag_index t"
+                    " WHERE t.trade_date = b1_signal_results.trade_date AND t.ts_code = b1_signal_results.ts_code"
+                    f" AND t.tag_code IN ({', '.join(['%s'] * len(tag_list))}))"
                 )
-            ]
+                params.extend(tag_list)
+            else:
+                # 该交易日尚未建立标签索引（历史数据未重建）时退回JSON匹配
+                for tag in tag_list:
+                    where += " AND (matched_tag_codes IS NULL OR NOT JSON_CONTAINS(matched_tag_codes, JSON_QUOTE(%s)))"
+                    params.append(tag)
 
-        total_count = len(results)
-        offset = (page - 1) * page_size
-        paginated_results = results[offset:offset + page_size]
+        cursor.execute(f"SELECT COUNT(*) AS total FROM b1_signal_results {where}", params)
+        total_count = cursor.fetchone()['total']
 
+        offset = (page - 1) * page_size
+        cursor.execute(
+            f"SELECT {', '.join(B1_RESULT_LIST_COLUMNS)} FROM b1_signal_results {where} "
+            f"ORDER BY tag_score DESC, volume_ratio DESC, id ASC LIMIT %s OFFSET %s",
+            params + [page_size, offset]
+        )
+        paginated_results = cursor.fetchall()
         cursor.close()
 
+        for row in paginated_results:
+            for column in B1_RESULT_JSON_COLUMNS:
+                if row.get(column):
+                    row[column] = json.loads(row[column])
+
         return {'success': True, 'total': total_count, 'data': paginated_results, 'page': page, 'page_size': page_size}
+    finally:
+        if conn:
+            conn.close()
+
+
+@router.get("/worker-status")
+async def get_worker_status():
+    return {'success': True, 'data': b1_executor.stats()}
 
+
+@router.get("/results", dependencies=[Depends(conditional_get)])
+async def get_b1_signal_results(
+    trade_date: Optional[str] = Query(None),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    j_value: Optional[int] = Query(None, description="J值阈值过滤"),
+    matched_tag_codes: Optional[str] = Query(None, description="标签过滤，逗号分隔")
+):
+    try:
+        params = {'trade_date': trade_date, 'page': page, 'page_size': page_size,
+                  'j_value': j_value, 'matched_tag_codes': matched_tag_codes}
+        return await cached_response(
+            'b1-results', params,
+            lambda: b1_executor.run(_query_b1_signal_results, trade_date, page, page_size, j_value, matched_tag_codes)
+        )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"查询B1信号结果失败: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        if conn:
-            conn.close()
 
 
-@router.get("/stock-detail")
-async def get_stock_detail(code: str = Query(..., description="股票代码，如 000547.SZ")):
+def _run_get_stock_detail(code: str, start: Optional[str], end: Optional[str],
+                          limit: Optional[int], since: Optional[str]):
     service = B1SignalService()
     try:
         service.connect()
-        result = service.get_stock_detail(code)
-        if result['success']:
-            return result
-        else:
-            raise HTTPException(status_code=404, detail=result['message'])
+        result = service.get_stock_detail(code, start=start, end=end, limit=limit, since=since)
+    finally:
+        service.close()
+    # 在工作线程中完成编码，缓存的是编码后的响应体
+    return result, dumps(result) if result['success'] else None
+
+
+@router.get("/stock-detail", response_class=FastJSONResponse, dependencies=[Depends(conditional_get)])
+async def get_stock_detail(
+    response: Response,
+    code: str = Query(..., description="股票代码，如 000547.SZ"),
+    start: Optional[str] = Query(None, description="开始日期(YYYYMMDD，含)"),
+    end: Optional[str] = Query(None, description="结束日期(YYYYMMDD，含)；向前翻页时传上一页返回的 next_end"),
+    limit: Optional[int] = Query(None, ge=1, le=5000, description="最多返回最近N根K线"),
+    since: Optional[str] = Query(None, description="增量游标(YYYYMMDD，不含)；传上次返回的 latest")
+):
+    try:
+        use_cache = settings.RESPONSE_CACHE_ENABLED
+        key = response_cache_key('b1-stock-detail', {
+            'code': code, 'start': start, 'end': end, 'limit': limit, 'since': since
+        })
+        body = stock_detail_cache.get(key) if use_cache else None
+        if body is None:
+            result, body = await b1_executor.run(_run_get_stock_detail, code, start, end, limit, since)
+            if body is None:
+                raise HTTPException(status_code=404, detail=result['message'])
+            # 不带limit的全量历史等大响应体不缓存，缓存内存上限为 条目数 × 单条上限
+            if use_cache and len(body) <= settings.STOCK_DETAIL_CACHE_MAX_BODY_BYTES:
+                stock_detail_cache.set(key, body)
+        # 直接返回Response时FastAPI不合并依赖写入的响应头，需把 conditional_get 的 ETag 等带上
+        return Response(content=body, media_type='application/json', headers=dict(response.headers))
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"获取股票详情失败: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        service.close()
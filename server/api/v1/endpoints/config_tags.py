@@ -1,5 +1,6 @@
 from fastapi import APIRouter, HTTPException, Query, Depends
 from core.database import get_db
+from core.cache import bump_data_version
 from pydantic import BaseModel
 from typing import Optional
 
@@ -39,4 +40,5 @@ async def update_tag(req: TagUpdateRequest, db=Depends(get_db)):
                 (req.id, req.user_id)
             )
         await db.commit()
+    bump_data_version()
     return {'success': True}
@@ -111,7 +111,7 @@ async def update_watchlist_note(
             values.append(1 if is_active else 0)
 
         if not updates:
-            raise = HTTPException(status_code=400, detail="没有要更新的字段")
+            raise HTTPException(status_code=400, detail="没有要更新的字段")
 
         values.extend([user_id, ts_code])
 
@@ -0,0 +1,174 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+from core.config import settings
+
+
+class TTLCache:
+    """
+    线程安全的 TTL + LRU 内存缓存
+
+    条目写入 ttl 秒后过期；超过 max_entries 时淘汰最久未访问的条目。
+    """
+
+    def __init__(self, name: str, ttl: float, max_entries: int = 1024):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] <= now:
+                if item is not None:
+                    del self._data[key]
+                self._misses += 1
+                return None
+            self._data.move_to_end(key)
+            self._hits += 1
+            return item[1]
+
+    def set(self, key: Hashable, value: Any):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'name': self.name,
+                'entries': len(self._data),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self._hits,
+                'misses': self._misses
+            }
+
+
+# 已认证用户缓存：JWT sub(用户ID字符串) -> users表记录
+user_principal_cache = TTLCache(
+    name='user-principal',
+    ttl=settings.AUTH_USER_CACHE_TTL,
+    max_entries=settings.AUTH_USER_CACHE_SIZE
+)
+
+
+# 只读接口响应缓存：数据只在每日定时任务（及标签配置修改）后变化
+response_cache = TTLCache(
+    name='response',
+    ttl=settings.RESPONSE_CACHE_TTL,
+    max_entries=settings.RESPONSE_CACHE_SIZE
+)
+
+# 个股详情：按代码和查询区间缓存编码后的响应体（K线分页、增量请求分别成条目，LRU淘汰；
+# 超过 STOCK_DETAIL_CACHE_MAX_BODY_BYTES 的响应体不缓存）
+stock_detail_cache = TTLCache(
+    name='stock-detail',
+    ttl=settings.RESPONSE_CACHE_TTL,
+    max_entries=settings.STOCK_DETAIL_CACHE_SIZE
+)
+
+# 数据版本：启动时（以库中最新交易日初始化）、每日任务落库完成、标签配置修改后递增；
+# 缓存键包含版本号，递增后旧条目不再命中
+_data_version = {'version': 0, 'trade_date': None}
+_data_version_lock = threading.Lock()
+_inflight: Dict[Hashable, "asyncio.Task"] = {}
+
+
+def data_version() -> Tuple[int, Optional[str]]:
+    """当前数据版本：(版本号, 最新落库交易日)"""
+    with _data_version_lock:
+        return _data_version['version'], _data_version['trade_date']
+
+
+def bump_data_version(trade_date: Optional[str] = None) -> int:
+    """
+    递增数据版本并清空响应缓存
+
+    Args:
+        trade_date: 最新落库交易日（每日任务传入，其他修改沿用当前值）
+
+    Returns:
+        新的版本号
+    """
+    with _data_version_lock:
+        _data_version['version'] += 1
+        if trade_date is not None:
+            _data_version['trade_date'] = trade_date
+        version = _data_version['version']
+    response_cache.clear()
+    stock_detail_cache.clear()
+    return version
+
+
+def response_cache_key(name: str, params: Dict[str, Any]) -> tuple:
+    """缓存键：接口名 + 数据版本 + 最新交易日 + 排序后的请求参数"""
+    version, trade_date = data_version()
+    return (name, version, trade_date, tuple(sorted(params.items())))
+
+
+async def cached_response(name: str, params: Dict[str, Any], loader: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    读取响应缓存，未命中时调用 loader 并写入缓存
+
+    同一个键同时只有一个请求执行 loader，其余请求等待其结果，避免版本递增后大量轮询同时查库。
+
+    Args:
+        name: 接口名
+        params: 影响返回结果的请求参数
+        loader: 生成响应的协程函数
+
+    Returns:
+        响应数据
+    """
+    if not settings.RESPONSE_CACHE_ENABLED:
+        return await loader()
+
+    key = response_cache_key(name, params)
+    value = response_cache.get(key)
+    if value is not None:
+        return value
+
+    task = _inflight.get(key)
+    if task is None:
+        # loader 在独立任务中执行：发起请求的客户端断开时只取消它自己的等待，
+        # 加载继续进行，其他合并到该键的请求照常拿到结果
+        task = asyncio.ensure_future(_load_response(key, loader))
+        task.add_done_callback(_retrieve_exception)
+        _inflight[key] = task
+    return await asyncio.shield(task)
+
+
+async def _load_response(key: tuple, loader: Callable[[], Awaitable[Any]]) -> Any:
+    """执行 loader 并写入缓存（在 cached_response 创建的任务中运行）"""
+    try:
+        value = await loader()
+        # 加载期间版本已递增时不写入，避免旧数据占用新版本之前的缓存
+        if key[1:3] == data_version():
+            response_cache.set(key, value)
+        return value
+    finally:
+        _inflight.pop(key, None)
+
+
+def _retrieve_exception(task: asyncio.Task):
+    """所有等待者都已断开时避免 "Task exception was never retrieved" 警告"""
+    if not task.cancelled():
+        task.exception()
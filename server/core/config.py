@@ -10,14 +10,63 @@ class Settings(BaseSettings):
     DB_NAME: str = "xxxxxxxxxx"
     DB_CHARSET: str = "utf8mb4"
 
+    # 异步接口的aiomysql连接池
+    DB_POOL_MIN_SIZE: int = 2
+    DB_POOL_MAX_SIZE: int = 20
+    DB_POOL_RECYCLE: int = 3600
+    DB_POOL_PING_IDLE_SECONDS: int = 30
+
     TUSHARE_TOKEN: str = "xxxxxxxxxxxxxxxxx"
+    # Tushare接口调用：账号每分钟额度 / 并行获取线程数 / 失败重试次数 / 退避基准秒数
+    TUSHARE_CALLS_PER_MINUTE: int = 200
+    TUSHARE_FETCH_WORKERS: int = 4
+    TUSHARE_MAX_RETRIES: int = 3
+    TUSHARE_RETRY_BASE_SECONDS: float = 1.0
+    # Tushare原始响应本地缓存：off / readwrite / replay（只读缓存，未命中报错）
+    TUSHARE_CACHE_MODE: str = "off"
+    TUSHARE_CACHE_DIR: str = "data/tushare_cache"
+    TUSHARE_CACHE_RETENTION_DAYS: int = 30
+    # stk_factor_pro 列配置：full=全部列，b1=只请求/保存B1计算用到的列；
+    # 非full时可配置归档目录，将接口返回的全部列按交易日压缩归档
+    TUSHARE_STK_FACTOR_PROFILE: str = "full"
+    TUSHARE_FACTOR_ARCHIVE_DIR: str = ""
+    # 落库流水线阶段间队列长度（获取→转换→落库）
+    INGEST_PIPELINE_QUEUE_SIZE: int = 2
+    # stk_factor_pro 流式落库：>0 时按该行数分页（limit/offset）获取，每页单独转换、落库，
+    # 内存占用取决于分页大小而非全市场行数；0 表示整日一次获取（单次上限1万行）
+    INGEST_STREAM_CHUNK_ROWS: int = 0
+
+    # 数据落库：大批量写入使用 LOAD DATA LOCAL INFILE（需MySQL开启local_infile），失败时自动回退到INSERT
+    INGEST_LOAD_DATA_ENABLED: bool = False
+    INGEST_LOAD_DATA_MIN_ROWS: int = 2000
+    # 数据落库：按行内容哈希（row_hash列）比对，只写入新增或变化的行
+    INGEST_SKIP_UNCHANGED: bool = True
 
     JWT_SECRET_KEY: str = "xxxxxxxxxxxxx"
     JWT_ALGORITHM: str = "HS256"
     JWT_EXPIRE_MINUTES: int = 1440
 
+    # 已认证用户缓存（秒 / 最大条目数），用户被修改或删除时主动失效
+    AUTH_USER_CACHE_TTL: int = 60
+    AUTH_USER_CACHE_SIZE: int = 10000
+    # 只读接口响应缓存（每日任务完成后按数据版本失效；TTL兜底其他进程写入的数据）
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_TTL: int = 3600
+    RESPONSE_CACHE_SIZE: int = 512
+    STOCK_DETAIL_CACHE_SIZE: int = 1024
+    # 个股详情单个响应体超过该字节数时不缓存（250根K线约30KB），缓存内存上限约为 SIZE × 该值
+    STOCK_DETAIL_CACHE_MAX_BODY_BYTES: int = 65536
+    # 响应体超过该字节数时gzip压缩（0表示不压缩）
+    RESPONSE_GZIP_MIN_SIZE: int = 0
+    # 只读接口的 ETag / Last-Modified 条件GET
+    CONDITIONAL_GET_ENABLED: bool = True
+
     LOG_LEVEL: str = "INFO"
 
+    # B1信号接口工作线程池（同时执行数 / 最大排队数，超出返回503）
+    B1_WORKER_CONCURRENCY: int = 4
+    B1_WORKER_QUEUE_LIMIT: int = 16
+
     WECHAT_APP_ID: str = ""
     WECHAT_APP_SECRET: str = ""
     WECHAT_REDIRECT_URI: str = ""
@@ -1,25 +1,90 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
 import aiomysql
 import pymysql
 from dbutils.pooled_db import PooledDB
 from core.config import settings
 
-async def get_db_connection():
-    conn = await aiomysql.connect(
-        host=settings.DB_HOST,
-        port=settings.DB_PORT,
-        user=settings.DB_USER,
-        password=settings.DB_PASSWORD,
-        db=settings.DB_NAME,
-        charset=settings.DB_CHARSET
+_async_pool = None
+_async_pool_stats = {
+    'acquired': 0,
+    'wait_seconds_total': 0.0,
+    'wait_seconds_max': 0.0,
+    'pings': 0,
+    'ping_failures': 0
+}
+
+
+async def init_db_pool():
+    """创建应用级aiomysql连接池（在main.lifespan中调用）"""
+    global _async_pool
+    if _async_pool is None:
+        _async_pool = await aiomysql.create_pool(
+            host=settings.DB_HOST,
+            port=settings.DB_PORT,
+            user=settings.DB_USER,
+            password=settings.DB_PASSWORD,
+            db=settings.DB_NAME,
+            charset=settings.DB_CHARSET,
+            minsize=settings.DB_POOL_MIN_SIZE,
+            maxsize=settings.DB_POOL_MAX_SIZE,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            # 只读请求不留未结束事务，连接归还后可直接复用；写操作仍显式commit
+            autocommit=True
+        )
+    return _async_pool
+
+
+async def close_db_pool():
+    global _async_pool
+    if _async_pool is not None:
+        _async_pool.close()
+        await _async_pool.wait_closed()
+        _async_pool = None
+
+
+def get_db_pool_stats() -> dict:
+    stats = dict(_async_pool_stats)
+    stats['wait_seconds_avg'] = (
+        stats['wait_seconds_total'] / stats['acquired'] if stats['acquired'] else 0.0
     )
-    return conn
+    if _async_pool is not None:
+        stats.update({
+            'size': _async_pool.size,
+            'free': _async_pool.freesize,
+            'used': _async_pool.size - _async_pool.freesize,
+            'minsize': _async_pool.minsize,
+            'maxsize': _async_pool.maxsize
+        })
+    return stats
+
 
 async def get_db():
-    conn = await get_db_connection()
-    try:
+    pool = _async_pool or await init_db_pool()
+
+    start = time.perf_counter()
+    async with pool.acquire() as conn:
+        wait = time.perf_counter() - start
+        _async_pool_stats['acquired'] += 1
+        _async_pool_stats['wait_seconds_total'] += wait
+        _async_pool_stats['wait_seconds_max'] = max(_async_pool_stats['wait_seconds_max'], wait)
+
+        # 空闲较久的连接先做健康检查，断开时自动重连
+        idle = asyncio.get_running_loop().time() - conn.last_usage
+        if idle > settings.DB_POOL_PING_IDLE_SECONDS:
+            _async_pool_stats['pings'] += 1
+            try:
+                await conn.ping(reconnect=True)
+            except Exception:
+                _async_pool_stats['ping_failures'] += 1
+                raise
+
         yield conn
-    finally:
-        conn.close()
+
+
+# 按需获取连接（响应缓存命中时不占用连接池）：async with db_connection() as db
+db_connection = asynccontextmanager(get_db)
 
 _sync_pool = None
 
@@ -0,0 +1,72 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+from fastapi import HTTPException
+from core.config import settings
+
+
+class BoundedExecutor:
+    """
+    有界线程池：在独立线程中执行阻塞的数据库/pandas计算，避免阻塞事件循环
+
+    同时执行的任务数受 max_workers 限制，排队任务数受 max_queue 限制，
+    超出时直接返回503，防止重计算请求堆积拖垮整个API。
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._rejected = 0
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise HTTPException(
+                    status_code=503,
+                    detail="服务繁忙，请稍后重试",
+                    headers={"Retry-After": "5"}
+                )
+            self._pending += 1
+
+        # 计数在线程任务结束时递减，而不是在等待方协程结束时：客户端断开会取消等待，
+        # 但已开始执行的线程任务仍占用线程池，提前递减会使实际积压超过上限
+        try:
+            future = self._executor.submit(functools.partial(func, *args, **kwargs))
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, _future=None):
+        with self._lock:
+            self._pending -= 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'name': self.name,
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'pending': self._pending,
+                'running': min(self._pending, self.max_workers),
+                'queued': max(self._pending - self.max_workers, 0),
+                'rejected': self._rejected
+            }
+
+    def shutdown(self, wait: bool = False):
+        self._executor.shutdown(wait=wait)
+
+
+b1_executor = BoundedExecutor(
+    name='b1-worker',
+    max_workers=settings.B1_WORKER_CONCURRENCY,
+    max_queue=settings.B1_WORKER_QUEUE_LIMIT
+)
@@ -0,0 +1,64 @@
+import datetime
+import decimal
+from typing import Any, Dict
+import numpy as np
+import orjson
+import pandas as pd
+from fastapi.responses import JSONResponse
+
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj: Any) -> Any:
+    """orjson 不能直接序列化的类型：Decimal、pandas时间/缺失值、object类型的numpy数组等"""
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, (pd.Timestamp, datetime.datetime, datetime.date)):
+        return None if pd.isna(obj) else obj.isoformat()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if obj is pd.NA or obj is pd.NaT:
+        return None
+    raise TypeError(f"无法序列化的类型: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """orjson 序列化（numpy 数组/标量直接按C实现输出，NaN 输出为 null）"""
+    return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+
+
+def frame_columns(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    DataFrame 转为按列的数组字典，数值列保持为numpy数组由orjson整列输出
+
+    Args:
+        df: 数据
+
+    Returns:
+        {列名: 数组}
+    """
+    columns = {}
+    for col in df.columns:
+        values = df[col].to_numpy()
+        if values.dtype.kind in 'biuf':
+            columns[col] = np.ascontiguousarray(values)
+        elif values.dtype.kind == 'M':
+            columns[col] = df[col].astype(object).tolist()
+        else:
+            columns[col] = [None if v is None or (isinstance(v, float) and np.isnan(v)) else v
+                            for v in values.tolist()]
+    return columns
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    大结果集使用的JSON响应
+
+    接口直接返回该响应对象时，FastAPI 不再对内容逐值执行 jsonable_encoder，
+    由 orjson 一次完成序列化（Decimal 按 float 输出，numpy 数组按列输出）。
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
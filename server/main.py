@@ -1,5 +1,6 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from contextlib import asynccontextmanager
 import schedule
 import time
@@ -7,14 +8,19 @@ import threading
 from datetime import datetime
 from scheduler.tushare_job import TushareDataIntegrator
 from scheduler.b1_signal_job import run_b1_signal_calculation
+from services.market_snapshot_service import refresh_market_snapshot, LATEST_TRADE_DATE_SQL
 from core.config import settings
 from utils.logger import setup_logger
 from api.v1.router import api_router
+from core.executor import b1_executor
+from core.cache import user_principal_cache, response_cache, stock_detail_cache, bump_data_version
+from core.database import init_db_pool, close_db_pool, get_db_pool_stats, db_connection
 
 logger = setup_logger(__name__, 'main.log')
 
 
 def run_daily_jobs():
+    trade_date = datetime.now().strftime('%Y%m%d')
     try:
         logger.info("=" * 80)
         logger.info(f"开始执行每日定时任务 - {datetime.now()}")
@@ -24,7 +30,6 @@ def run_daily_jobs():
             db_config=settings.db_config
         )
         
-        trade_date = datetime.now().strftime('%Y%m%d')
         result = integrator.integrate_daily_data(trade_date)
         logger.info(f"基础数据落库完成: {result}")
         integrator.close()
@@ -32,12 +37,18 @@ def run_daily_jobs():
         logger.info("步骤2：开始执行B1信号计算...")
         run_b1_signal_calculation()
         logger.info("B1信号计算完成")
+
+        logger.info("步骤3：刷新市场概览快照...")
+        refresh_market_snapshot()
         
         logger.info(f"每日定时任务执行完成 - {datetime.now()}")
         logger.info("=" * 80)
         
     except Exception as e:
         logger.error(f"每日定时任务执行失败: {e}", exc_info=True)
+    finally:
+        # 无论成功与否数据都可能已变化，使只读接口的响应缓存失效
+        bump_data_version(trade_date)
 
 
 def schedule_jobs():
@@ -51,12 +62,31 @@ def schedule_jobs():
         time.sleep(60)
 
 
+async def init_data_trade_date():
+    """启动时以库中最新交易日初始化数据版本，使响应缓存键在首次每日任务前也带有交易日"""
+    try:
+        async with db_connection() as db:
+            async with db.cursor() as cursor:
+                await cursor.execute(LATEST_TRADE_DATE_SQL)
+                row = await cursor.fetchone()
+        if row and row[0]:
+            bump_data_version(str(row[0]))
+            logger.info(f"数据版本已初始化，最新交易日: {row[0]}")
+    except Exception as e:
+        logger.warning(f"读取最新交易日失败: {e}")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    await init_db_pool()
+    logger.info("数据库连接池已创建")
+    await init_data_trade_date()
     scheduler_thread = threading.Thread(target=schedule_jobs, daemon=True)
     scheduler_thread.start()
     logger.info("定时任务线程已启动")
     yield
+    b1_executor.shutdown(wait=False)
+    await close_db_pool()
 
 
 app = FastAPI(
@@ -73,6 +103,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.RESPONSE_GZIP_MIN_SIZE > 0:
+    app.add_middleware(GZipMiddleware, minimum_size=settings.RESPONSE_GZIP_MIN_SIZE)
+
 app.include_router(api_router, prefix="/api/v1")
 
 
@@ -81,6 +114,20 @@ async def root():
     return {"message": "TTSS Report Backend API"}
 
 
+@app.get("/health/db-pool")
+async def db_pool_health():
+    return get_db_pool_stats()
+
+
+@app.get("/health/caches")
+async def caches_health():
+    return {
+        "user_principal": user_principal_cache.stats(),
+        "response": response_cache.stats(),
+        "stock_detail": stock_detail_cache.stats()
+    }
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -24,7 +24,6 @@ def run_b1_signal_calculation(trade_date: str = None):
 
     try:
         service.connect()
-        B1SignalService.clear_cache()
 
         admin_user_id = get_admin_user_id(service)
         logger.info(f"使用管理员用户ID: {admin_user_id} 的标签配置进行计算")
@@ -39,14 +38,13 @@ def run_b1_signal_calculation(trade_date: str = None):
                 logger.error("无法获取最新交易日期")
                 return
 
-        logger.info(f"开始计算 {trade_date} 的B1信号（定时任务，强制刷新缓存）...")
+        logger.info(f"开始计算 {trade_date} 的B1信号（定时任务）...")
 
         result = service.filter_and_tag(
             trade_date=trade_date,
             custom_tags=None,
             ts_codes=None,
             save_to_db=True,
-            force_refresh_cache=True,
             user_id=admin_user_id
         )
 
@@ -59,3 +57,17 @@ def run_b1_signal_calculation(trade_date: str = None):
         logger.error(f"B1信号计算任务失败: {e}", exc_info=True)
     finally:
         service.close()
+
+
+def rebuild_b1_tag_index(trade_date: str = None):
+    """由 b1_signal_results 的JSON标签列重建 b1_signal_tag_index（为空时重建全部交易日）"""
+    service = B1SignalService(settings.db_config)
+
+    try:
+        service.connect()
+        total = service.rebuild_tag_index(trade_date)
+        logger.info(f"B1标签索引重建完成，共 {total} 条")
+    except Exception as e:
+        logger.error(f"B1标签索引重建失败: {e}", exc_info=True)
+    finally:
+        service.close()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+历史数据回补（可断点续跑）
+按交易日回补 bak_daily_data / stk_factor_pro_data，每个交易日落库提交后写入 ingest_checkpoint，
+重跑时跳过已完成的交易日；中断最多损失正在落库的那一个交易日。
+接口返回空数据（通常是数据尚未发布）的交易日记为 skipped，与 failed 一样在重跑时重新回补。
+"""
+
+import logging
+from typing import Dict, List, Optional, Set, Tuple
+from core.config import settings
+from scheduler.tushare_job import TushareDataIntegrator
+from scheduler.tushare_pipeline import IngestPipeline
+
+logger = logging.getLogger(__name__)
+
+DATASETS = ('bak_daily', 'stk_factor_pro')
+
+
+class IngestCheckpoint:
+    """ingest_checkpoint 表读写"""
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def completed_dates(self, dataset: str, start_date: str, end_date: str) -> Set[str]:
+        """[start_date, end_date] 内已完成的交易日"""
+        raw_conn = self.engine.raw_connection()
+        try:
+            cursor = raw_conn.cursor()
+            try:
+                cursor.execute(
+                    "SELECT trade_date FROM ingest_checkpoint "
+                    "WHERE dataset = %s AND status = 'done' AND trade_date BETWEEN %s AND %s",
+                    [dataset, start_date, end_date]
+                )
+                return {row[0] for row in cursor.fetchall()}
+            finally:
+                cursor.close()
+        finally:
+            raw_conn.close()
+
+    def mark(self, dataset: str, trade_date: str, status: str, records: int = 0,
+             error_message: str = None, timings: Dict[str, float] = None):
+        """记录单个交易日的完成情况（独立提交）"""
+        timings = timings or {}
+        raw_conn = self.engine.raw_connection()
+        try:
+            cursor = raw_conn.cursor()
+            try:
+                cursor.execute(
+                    """
+                    INSERT INTO ingest_checkpoint
+                        (dataset, trade_date, status, records, error_message,
+                         fetch_seconds, convert_seconds, save_seconds)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE
+                        status=VALUES(status), records=VALUES(records), error_message=VALUES(error_message),
+                        fetch_seconds=VALUES(fetch_seconds), convert_seconds=VALUES(convert_seconds),
+                        save_seconds=VALUES(save_seconds)
+                    """,
+                    [dataset, trade_date, status, records, error_message,
+                     timings.get('fetch'), timings.get('convert'), timings.get('save')]
+                )
+                raw_conn.commit()
+            finally:
+                cursor.close()
+        finally:
+            raw_conn.close()
+
+
+def run_backfill(start_date: str, end_date: str, datasets: Optional[List[str]] = None,
+                 force: bool = False, integrator: TushareDataIntegrator = None) -> Dict:
+    """
+    回补 [start_date, end_date] 区间内的历史数据
+
+    两个数据集的交易日共用一条流水线：获取阶段受同一个Tushare令牌桶限流并行执行，
+    落库在当前线程按完成顺序逐日提交并写入断点。
+
+    Args:
+        start_date: 开始日期(YYYYMMDD)
+        end_date: 结束日期(YYYYMMDD)
+        datasets: 数据集列表，默认全部（bak_daily、stk_factor_pro）
+        force: 是否忽略断点重新回补
+        integrator: 数据集成器，默认按settings创建
+
+    Returns:
+        {数据集: {'done': 完成天数, 'skipped': 跳过天数, 'empty': [无数据的交易日], 'failed': [失败的交易日]}}
+
+    Raises:
+        KeyboardInterrupt: 回补被中断（流水线已停止，已提交的交易日断点保留）
+    """
+    datasets = list(datasets or DATASETS)
+    unknown = set(datasets) - set(DATASETS)
+    if unknown:
+        raise ValueError(f"未知数据集: {', '.join(sorted(unknown))}")
+
+    own_integrator = integrator is None
+    if own_integrator:
+        integrator = TushareDataIntegrator(settings.TUSHARE_TOKEN, settings.db_config)
+
+    try:
+        checkpoint = IngestCheckpoint(integrator.engine)
+        trade_dates = sorted(integrator.get_trade_cal(start_date, end_date))
+        logger.info(f"回补区间 {start_date} 至 {end_date}，共{len(trade_dates)}个交易日，数据集: {datasets}")
+
+        summary = {dataset: {'done': 0, 'skipped': 0, 'empty': [], 'failed': []} for dataset in datasets}
+        tasks: List[Tuple[str, str]] = []
+        for dataset in datasets:
+            done = set() if force else checkpoint.completed_dates(dataset, start_date, end_date)
+            pending = [td for td in trade_dates if td not in done]
+            summary[dataset]['skipped'] = len(trade_dates) - len(pending)
+            tasks.extend((dataset, td) for td in pending)
+            logger.info(f"{dataset}: 已完成{summary[dataset]['skipped']}天，待回补{len(pending)}天")
+
+        fetchers = {
+            'bak_daily': integrator.fetch_bak_daily_data,
+            'stk_factor_pro': integrator.fetch_stk_factor_pro_data,
+        }
+        savers = {
+            'bak_daily': integrator.save_bak_daily_data,
+            'stk_factor_pro': integrator.save_stk_factor_pro_data,
+        }
+
+        # 按日期交错两个数据集，使同一交易日的数据尽早一起落库
+        tasks.sort(key=lambda task: (task[1], task[0]))
+
+        pipeline = IngestPipeline(
+            fetch=lambda task: fetchers[task[0]](task[1], convert=False),
+            convert=lambda task, df: integrator._convert_data_types(df, task[0]),
+            save=lambda task, df: savers[task[0]](df, task[1]) if not df.empty else (0, 0, 0, ""),
+            fetch_workers=settings.TUSHARE_FETCH_WORKERS,
+            queue_size=settings.INGEST_PIPELINE_QUEUE_SIZE
+        )
+
+        stages = pipeline.run(tasks)
+        try:
+            for index, stage in enumerate(stages, start=1):
+                dataset, trade_date = stage.item
+                error = stage.error
+                if error is None:
+                    inserted, updated, skipped, save_error = stage.result
+                    # 部分行写入失败也视为失败，重跑时整日重新回补
+                    if save_error:
+                        error = save_error
+
+                if error is not None:
+                    checkpoint.mark(dataset, trade_date, 'failed', 0, error, stage.timings)
+                    summary[dataset]['failed'].append(trade_date)
+                    logger.error(f"{dataset} {trade_date} 回补失败: {error}")
+                elif stage.records == 0:
+                    # 接口无数据（通常是尚未发布），不记为完成，重跑时重试
+                    checkpoint.mark(dataset, trade_date, 'skipped', 0, '接口返回空数据', stage.timings)
+                    summary[dataset]['empty'].append(trade_date)
+                    logger.warning(f"{dataset} {trade_date} 接口返回空数据，重跑时重试")
+                else:
+                    checkpoint.mark(dataset, trade_date, 'done', stage.records, timings=stage.timings)
+                    summary[dataset]['done'] += 1
+
+                logger.info(f"回补进度 {index}/{len(tasks)}: {dataset} {trade_date} 记录{stage.records}条")
+        except KeyboardInterrupt:
+            logger.warning(f"回补被中断，已完成部分: {summary}")
+            raise
+        finally:
+            stages.close()
+
+        logger.info(f"回补完成: {summary}")
+        return summary
+    finally:
+        if own_integrator:
+            integrator.close()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tushare原始响应的本地缓存（按接口名+参数内容寻址，Parquet格式）
+
+模式：
+    off        不使用缓存
+    readwrite  命中则直接返回，未命中时调用接口并写入缓存
+    replay     只从缓存读取，未命中直接报错（离线重放/基准测试，不消耗接口额度）
+
+FactorArchive 为列投影落库时的全量归档：主表只保存热点列，接口返回的全部列按交易日压缩归档。
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+MODES = ('off', 'readwrite', 'replay')
+
+
+class CacheMiss(LookupError):
+    """replay模式下缓存未命中"""
+
+
+class ResponseCache:
+    """
+    Tushare响应缓存
+
+    文件路径为 <目录>/<接口名>/<sha1(接口名+排序后的参数)>.parquet，写入时先写临时文件再原子替换。
+    按交易日查询的历史数据不会变化，保留 retention_days 天；
+    stock_basic、trade_cal 这类随时间变化的接口在 readwrite 模式下只缓存 volatile_ttl_seconds 秒。
+    """
+
+    VOLATILE_APIS = ('stock_basic', 'trade_cal')
+
+    def __init__(self, directory: str, mode: str = 'off', retention_days: int = 30,
+                 volatile_ttl_seconds: int = 6 * 3600):
+        if mode not in MODES:
+            raise ValueError(f"未知的缓存模式: {mode}，可选 {MODES}")
+        self.directory = Path(directory)
+        self.mode = mode
+        self.retention_seconds = retention_days * 86400
+        self.volatile_ttl_seconds = volatile_ttl_seconds
+        self.hits = 0
+        self.misses = 0
+
+        if self.mode != 'off':
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self.purge()
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != 'off'
+
+    @staticmethod
+    def key(api_name: str, params: Dict) -> str:
+        payload = json.dumps({'api': api_name, 'params': params}, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def path(self, api_name: str, params: Dict) -> Path:
+        return self.directory / api_name / f"{self.key(api_name, params)}.parquet"
+
+    def _max_age(self, api_name: str) -> float:
+        if self.mode == 'replay':
+            return float('inf')
+        if api_name in self.VOLATILE_APIS:
+            return min(self.volatile_ttl_seconds, self.retention_seconds)
+        return self.retention_seconds
+
+    def get(self, api_name: str, params: Dict) -> Optional[pd.DataFrame]:
+        """
+        读取缓存
+
+        Returns:
+            命中时返回DataFrame；未命中返回None（replay模式抛出CacheMiss）
+        """
+        path = self.path(api_name, params)
+        try:
+            fresh = time.time() - path.stat().st_mtime <= self._max_age(api_name)
+        except FileNotFoundError:
+            fresh = False
+
+        if fresh:
+            try:
+                df = pd.read_parquet(path)
+                self.hits += 1
+                return df
+            except Exception as e:
+                logger.warning(f"读取Tushare缓存失败 {path}: {str(e)}")
+
+        self.misses += 1
+        if self.mode == 'replay':
+            raise CacheMiss(f"replay模式下缓存未命中: {api_name} {params}")
+        return None
+
+    def put(self, api_name: str, params: Dict, df: pd.DataFrame):
+        """写入缓存（空结果不缓存，避免数据尚未发布时缓存空数据）"""
+        if self.mode != 'readwrite' or df is None or df.empty:
+            return
+        path = self.path(api_name, params)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            df.to_parquet(tmp, index=False)
+            os.replace(tmp, path)
+        except Exception as e:
+            logger.warning(f"写入Tushare缓存失败 {path}: {str(e)}")
+            tmp.unlink(missing_ok=True)
+
+    def purge(self) -> int:
+        """删除超过保留期的缓存文件（replay模式不删除）"""
+        if self.mode != 'readwrite':
+            return 0
+        cutoff = time.time() - self.retention_seconds
+        removed = 0
+        for path in self.directory.glob('*/*.parquet'):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                pass
+        if removed:
+            logger.info(f"清理过期Tushare缓存{removed}个文件")
+        return removed
+
+
+class FactorArchive:
+    """
+    按交易日归档的全量数据（Parquet + zstd）
+
+    文件路径为 <目录>/<接口名>/<交易日>.parquet，流式获取时每页为 <交易日>-NNNN.parquet；
+    同一交易日重复获取时覆盖，整日文件与分页文件只保留最近写入的一种；不做过期清理。
+    """
+
+    def __init__(self, directory: str, compression: str = 'zstd'):
+        self.directory = Path(directory)
+        self.compression = compression
+
+    def path(self, api_name: str, trade_date: str, part: Optional[int] = None) -> Path:
+        name = trade_date if part is None else f"{trade_date}-{part:04d}"
+        return self.directory / api_name / f"{name}.parquet"
+
+    def part_paths(self, api_name: str, trade_date: str) -> List[Path]:
+        """单个交易日的分页文件（按分页序号排序）"""
+        return sorted((self.directory / api_name).glob(f"{trade_date}-[0-9][0-9][0-9][0-9].parquet"))
+
+    def _remove(self, paths: Iterable[Path]):
+        for path in paths:
+            path.unlink(missing_ok=True)
+
+    def write(self, api_name: str, trade_date: str, df: pd.DataFrame, part: Optional[int] = None):
+        """
+        归档单个交易日的全部列（空结果不归档；失败只记录日志，不影响落库）
+
+        Args:
+            api_name: 接口名
+            trade_date: 交易日期
+            df: 接口返回的数据
+            part: 流式获取时的分页序号（从0开始），每页单独成文件
+        """
+        if part == 0:
+            # 新一轮流式获取：删除整日文件和上一轮的分页（页数可能不同）
+            self._remove([self.path(api_name, trade_date), *self.part_paths(api_name, trade_date)])
+        if df is None or df.empty:
+            return
+        path = self.path(api_name, trade_date, part)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            df.to_parquet(tmp, index=False, compression=self.compression)
+            os.replace(tmp, path)
+            if part is None:
+                self._remove(self.part_paths(api_name, trade_date))
+        except Exception as e:
+            logger.warning(f"归档{api_name} {trade_date}失败 {path}: {str(e)}")
+            tmp.unlink(missing_ok=True)
+
+    def read(self, api_name: str, trade_date: str, columns=None) -> Optional[pd.DataFrame]:
+        """读取归档（整日文件或分页文件），不存在时返回None"""
+        whole = self.path(api_name, trade_date)
+        parts = self.part_paths(api_name, trade_date)
+        if whole.exists() and parts:
+            # 旧版本可能同时留下两种文件：取最近写入的一种，避免重复行
+            newest_part = max(path.stat().st_mtime for path in parts)
+            paths = [whole] if whole.stat().st_mtime >= newest_part else parts
+        else:
+            paths = [whole] if whole.exists() else parts
+        if not paths:
+            return None
+        return pd.concat([pd.read_parquet(path, columns=columns) for path in paths], ignore_index=True)
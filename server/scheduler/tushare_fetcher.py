@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tushare接口调用调度
+令牌桶限制每分钟调用次数，失败按带抖动的指数退避重试，多个交易日由有界线程池并行获取；
+可选的本地响应缓存（scheduler.tushare_cache）命中时不访问接口
+"""
+
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple
+from scheduler.tushare_cache import ResponseCache
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    令牌桶限流器（线程安全）
+
+    每分钟补充 rate_per_minute 个令牌，最多积累 capacity 个；acquire 在令牌不足时阻塞等待。
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else max(1.0, min(rate_per_minute / 10.0, 10.0))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        获取令牌
+
+        Returns:
+            本次等待的秒数
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                delay = (tokens - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class TushareFetcher:
+    """
+    Tushare接口调用器：所有调用共享同一个令牌桶，失败自动重试
+    """
+
+    def __init__(self, pro, calls_per_minute: int, max_workers: int = 4,
+                 max_retries: int = 3, retry_base_seconds: float = 1.0, retry_max_seconds: float = 30.0,
+                 cache: Optional[ResponseCache] = None):
+        """
+        Args:
+            pro: tushare pro_api 实例
+            calls_per_minute: 账号每分钟调用额度
+            max_workers: 并行获取的最大线程数
+            max_retries: 单次调用失败后的最大重试次数
+            retry_base_seconds: 退避基准秒数（第n次重试等待 base * 2^(n-1) 内的随机时长）
+            retry_max_seconds: 单次退避上限
+            cache: 原始响应缓存（可选），命中时不调用接口也不消耗额度
+        """
+        self.pro = pro
+        self.limiter = TokenBucket(calls_per_minute)
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.cache = cache
+
+    def call(self, api_name: str, **params) -> Any:
+        """
+        限流并带重试地调用Tushare接口
+
+        Args:
+            api_name: 接口名，如 stk_factor_pro
+            **params: 接口参数
+
+        Returns:
+            接口返回的DataFrame
+        """
+        if self.cache is not None and self.cache.enabled:
+            df = self.cache.get(api_name, params)
+            if df is not None:
+                return df
+
+        attempt = 0
+        while True:
+            self.limiter.acquire()
+            try:
+                df = getattr(self.pro, api_name)(**params)
+                if self.cache is not None:
+                    self.cache.put(api_name, params, df)
+                return df
+            except Exception as e:
+                attempt += 1
+                if attempt > self.max_retries:
+                    logger.error(f"调用{api_name}失败，已重试{self.max_retries}次: {str(e)}")
+                    raise
+                delay = random.uniform(0, min(self.retry_max_seconds, self.retry_base_seconds * 2 ** (attempt - 1)))
+                logger.warning(f"调用{api_name}失败（第{attempt}次），{delay:.1f}秒后重试: {str(e)}")
+                time.sleep(delay)
+
+    def run(self, func: Callable[[Any], Any], items: Iterable[Any]) -> Iterator[Tuple[Any, Any, Optional[Exception]]]:
+        """
+        用有界线程池并行执行 func(item)，按完成顺序逐个产出结果
+
+        调用方在迭代中即可处理（例如落库）已完成的结果，无需等待全部完成。
+
+        Args:
+            func: 单个任务，通常内部通过 call 访问Tushare
+            items: 任务参数（如交易日期）
+
+        Yields:
+            (item, 结果, 异常)，成功时异常为None
+        """
+        items = list(items)
+        if not items:
+            return
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items)),
+                                thread_name_prefix='tushare-fetch') as executor:
+            futures = {executor.submit(func, item): item for item in items}
+            for future in as_completed(futures):
+                item = futures[future]
+                try:
+                    yield item, future.result(), None
+                except Exception as e:
+                    yield item, None, e
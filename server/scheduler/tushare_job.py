@@ -12,12 +12,19 @@ import pandas as pd
 import numpy as np
 import time
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterator, List, Tuple, Optional
 import tushare as ts
 from sqlalchemy import create_engine
 from sqlalchemy.sql import text
 from sqlalchemy.pool import QueuePool
 import traceback
+from services.trade_calendar import TradeCalendar
+from scheduler.tushare_schema import SCHEMAS, BAK_DAILY_SCHEMA, STK_FACTOR_PRO_SCHEMA, get_stk_factor_pro_fields
+from utils.bulk_writer import BulkWriter
+from scheduler.tushare_fetcher import TushareFetcher
+from scheduler.tushare_cache import ResponseCache, FactorArchive
+from scheduler.tushare_pipeline import IngestPipeline
+from core.config import settings
 
 # 配置日志
 logging.basicConfig(
@@ -30,23 +37,49 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+STOCK_LIST_COLUMNS = ['ts_code', 'symbol', 'name', 'area', 'industry', 'cnspell',
+                      'market', 'list_date', 'act_name', 'act_ent_type']
+STOCK_LIST_WRITER = BulkWriter(
+    'stock_list', STOCK_LIST_COLUMNS,
+    update_columns=STOCK_LIST_COLUMNS[1:] + ['is_active'],
+    constants={'is_active': '1'},
+    batch_size=1000
+)
+
 
 class TushareDataIntegrator:
     """Tushare数据集成器"""
 
-    def __init__(self, tushare_token: str, db_config: Dict):
+    # 交易日历同步的起始日期
+    TRADE_CAL_START_DATE = '20000101'
+
+    def __init__(self, tushare_token: str, db_config: Dict, bulk_load: Optional[bool] = None):
         """
         初始化数据集成器
 
         Args:
             tushare_token: Tushare API密钥
             db_config: 数据库配置字典，包含host、port、user、password、database
+            bulk_load: 是否对大批量写入使用 LOAD DATA LOCAL INFILE，默认取 settings.INGEST_LOAD_DATA_ENABLED
         """
         self.tushare_token = tushare_token
         self.db_config = db_config
+        self.bulk_load = settings.INGEST_LOAD_DATA_ENABLED if bulk_load is None else bulk_load
+        self.skip_unchanged = settings.INGEST_SKIP_UNCHANGED
+
+        # stk_factor_pro 列配置：主表只保存配置内的列，全量数据可选压缩归档
+        self.stk_factor_fields = get_stk_factor_pro_fields(settings.TUSHARE_STK_FACTOR_PROFILE)
+        self.factor_archive = (
+            FactorArchive(settings.TUSHARE_FACTOR_ARCHIVE_DIR)
+            if self.stk_factor_fields is not None and settings.TUSHARE_FACTOR_ARCHIVE_DIR else None
+        )
         self.pro = None
+        self.fetcher = None
         self.engine = None
         self.stock_list = None
+        self._writers = {}
+        # 各表是否已有 row_hash 列（首次落库时检查一次）
+        self._row_hash_tables = {}
 
         # 初始化Tushare API
         self._init_tushare()
@@ -59,11 +92,36 @@ class TushareDataIntegrator:
         try:
             ts.set_token(self.tushare_token)
             self.pro = ts.pro_api()
+            self.fetcher = TushareFetcher(
+                self.pro,
+                calls_per_minute=settings.TUSHARE_CALLS_PER_MINUTE,
+                max_workers=settings.TUSHARE_FETCH_WORKERS,
+                max_retries=settings.TUSHARE_MAX_RETRIES,
+                retry_base_seconds=settings.TUSHARE_RETRY_BASE_SECONDS,
+                cache=ResponseCache(
+                    settings.TUSHARE_CACHE_DIR,
+                    mode=settings.TUSHARE_CACHE_MODE,
+                    retention_days=settings.TUSHARE_CACHE_RETENTION_DAYS
+                )
+            )
             logger.info("Tushare API初始化成功")
         except Exception as e:
             logger.error(f"Tushare API初始化失败: {str(e)}")
             raise
 
+    def _call_api(self, api_name: str, **params) -> pd.DataFrame:
+        """
+        调用Tushare接口（经 TushareFetcher 统一限流和重试）
+
+        Args:
+            api_name: 接口名
+            **params: 接口参数
+
+        Returns:
+            接口返回的DataFrame
+        """
+        return self.fetcher.call(api_name, **params)
+
     def _init_database(self):
         """初始化数据库连接"""
         try:
@@ -79,7 +137,8 @@ class TushareDataIntegrator:
                 max_overflow=10,
                 pool_recycle=3600,
                 pool_pre_ping=True,
-                echo=False
+                echo=False,
+                connect_args={'local_infile': True} if self.bulk_load else {}
             )
             # 测试连接
             with self.engine.connect() as conn:
@@ -104,7 +163,7 @@ class TushareDataIntegrator:
                 return self.stock_list
 
             logger.info("获取A股股票代码列表...")
-            df = self.pro.stock_basic(exchange='', list_status='L')
+            df = self._call_api('stock_basic', exchange='', list_status='L')
             df = df[df['ts_code'].str.contains(r'(SZ|SH|BJ)', regex=True)]
 
             self.stock_list = df
@@ -131,43 +190,11 @@ class TushareDataIntegrator:
 
             logger.info(f"开始批量保存{len(df)}只股票列表到数据库...")
 
-            df_clean = df.replace({np.nan: None, np.inf: None, -np.inf: None})
-            
-            columns = ['ts_code', 'symbol', 'name', 'area', 'industry', 'cnspell', 
-                      'market', 'list_date', 'act_name', 'act_ent_type']
-            
-            values_list = []
-            for _, row in df_clean.iterrows():
-                values = tuple(row.get(col) for col in columns)
-                values_list.append(values)
-
-            batch_size = 1000
-            total_affected = 0
-
             raw_conn = self.engine.raw_connection()
             try:
                 cursor = raw_conn.cursor()
                 try:
-                    for i in range(0, len(values_list), batch_size):
-                        batch = values_list[i:i + batch_size]
-                        batch_with_is_active = [row + (1,) for row in batch]
-                        placeholders = ','.join(['(%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)'] * len(batch))
-                        flat_values = [v for row in batch_with_is_active for v in row]
-                        
-                        sql = f"""
-                            INSERT INTO stock_list 
-                            (ts_code, symbol, name, area, industry, cnspell, market, list_date, act_name, act_ent_type, is_active)
-                            VALUES {placeholders}
-                            ON DUPLICATE KEY UPDATE
-                            symbol=VALUES(symbol), name=VALUES(name), area=VALUES(area), 
-                            industry=VALUES(industry), cnspell=VALUES(cnspell), market=VALUES(market),
-                            list_date=VALUES(list_date), act_name=VALUES(act_name), 
-                            act_ent_type=VALUES(act_ent_type), is_active=1
-                        """
-                        
-                        cursor.execute(sql, flat_values)
-                        total_affected += cursor.rowcount
-                        logger.info(f"批次{i//batch_size + 1}: 处理{len(batch)}条")
+                    total_affected = STOCK_LIST_WRITER.write_frame(cursor, df)
 
                     raw_conn.commit()
                     logger.info(f"股票列表保存完成: 共影响{total_affected}行")
@@ -228,9 +255,60 @@ class TushareDataIntegrator:
             logger.error(f"检测首次运行失败: {str(e)}")
             return True
 
+    def sync_trade_cal(self, end_date: str) -> bool:
+        """
+        确保本地交易日历覆盖指定日期（不覆盖时从Tushare全量拉取一次并落库）
+
+        Args:
+            end_date: 需要覆盖到的日期(YYYYMMDD)
+
+        Returns:
+            交易日历是否可用
+        """
+        raw_conn = self.engine.raw_connection()
+        try:
+            if TradeCalendar.ensure_loaded(raw_conn, end_date):
+                return True
+
+            logger.info("本地交易日历未覆盖，从Tushare同步交易日历...")
+            cal_end = f"{int(end_date[:4]) + 1}1231"
+            df = self._call_api('trade_cal', exchange=TradeCalendar.EXCHANGE, start_date=self.TRADE_CAL_START_DATE,
+                                    end_date=cal_end)
+            if df is None or len(df) == 0:
+                logger.warning("Tushare未返回交易日历")
+                return False
+
+            df = df.replace({np.nan: None})
+            values = list(zip(
+                [TradeCalendar.EXCHANGE] * len(df), df['cal_date'], df['is_open'].astype(int),
+                df['pretrade_date'] if 'pretrade_date' in df.columns else [None] * len(df)
+            ))
+            cursor = raw_conn.cursor()
+            try:
+                cursor.executemany(
+                    """
+                    INSERT INTO trade_calendar (exchange, cal_date, is_open, pretrade_date)
+                    VALUES (%s, %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE is_open=VALUES(is_open), pretrade_date=VALUES(pretrade_date)
+                    """,
+                    values
+                )
+                raw_conn.commit()
+            finally:
+                cursor.close()
+
+            TradeCalendar.load_rows(zip(df['cal_date'], df['is_open']))
+            logger.info(f"交易日历同步完成: {len(df)}条")
+            return TradeCalendar.covers(end_date)
+        except Exception as e:
+            logger.error(f"同步交易日历失败: {str(e)}")
+            return False
+        finally:
+            raw_conn.close()
+
     def get_trade_cal(self, start_date: str, end_date: str) -> List[str]:
         """
-        获取交易日历
+        获取交易日历（优先使用本地缓存的交易日历）
 
         Args:
             start_date: 开始日期(YYYYMMDD)
@@ -239,8 +317,13 @@ class TushareDataIntegrator:
         Returns:
             交易日期列表
         """
+        if self.sync_trade_cal(end_date) and TradeCalendar.covers(start_date):
+            trade_dates = TradeCalendar.trading_dates_between(start_date, end_date)
+            logger.info(f"获取到{len(trade_dates)}个交易日")
+            return trade_dates
+
         try:
-            df = self.pro.trade_cal(exchange='SSE', start_date=start_date, end_date=end_date, is_open='1')
+            df = self._call_api('trade_cal', exchange='SSE', start_date=start_date, end_date=end_date, is_open='1')
             trade_dates = df['cal_date'].tolist()
             logger.info(f"获取到{len(trade_dates)}个交易日")
             return trade_dates
@@ -248,60 +331,106 @@ class TushareDataIntegrator:
             logger.error(f"获取交易日历失败: {str(e)}")
             return []
 
-    def fetch_historical_stk_factor(self, ts_codes: List[str], trade_dates: List[str]) -> pd.DataFrame:
+    def get_recent_trade_dates(self, trade_date: str, days: int) -> List[str]:
         """
-        获取多个交易日的技术因子数据（考虑1万条上限）
+        获取截至trade_date（含）最近days个交易日，按日期升序
 
         Args:
-            ts_codes: 股票代码列表
-            trade_dates: 交易日期列表
+            trade_date: 交易日期(YYYYMMDD)
+            days: 交易日数量
 
         Returns:
-            技术因子数据DataFrame
+            交易日期列表
         """
-        try:
-            all_data = []
-            total_records = len(ts_codes) * len(trade_dates)
-            
-            logger.info(f"预计获取{total_records}条数据（{len(ts_codes)}只股票 × {len(trade_dates)}个交易日）")
-            
-            if total_records > 100000:
-                logger.info("数据量超过10万条，将按交易日分批获取")
-                for trade_date in trade_dates:
-                    logger.info(f"获取{trade_date}的技术因子数据...")
-                    df = self.fetch_stk_factor_pro_data(trade_date, ts_codes)
-                    if not df.empty:
-                        all_data.append(df)
-                    time.sleep(0.5)
-            else:
-                for trade_date in trade_dates:
-                    logger.info(f"获取{trade_date}的技术因子数据...")
-                    df = self.fetch_stk_factor_pro_data(trade_date, ts_codes)
-                    if not df.empty:
-                        all_data.append(df)
-                    time.sleep(0.5)
-
-            if all_data:
-                result_df = pd.concat(all_data, ignore_index=True)
-                logger.info(f"共获取{len(result_df)}条历史技术因子数据")
-                return result_df
-            else:
-                return pd.DataFrame()
+        if self.sync_trade_cal(trade_date):
+            return TradeCalendar.recent_trading_days(trade_date, days)
 
-        except Exception as e:
-            logger.error(f"获取历史技术因子数据失败: {str(e)}")
-            return pd.DataFrame()
+        # 本地日历不可用时按自然日估算区间再截取
+        end_date = datetime.strptime(trade_date, '%Y%m%d')
+        start_date = end_date - timedelta(days=days * 3)
+        all_trade_dates = sorted(self.get_trade_cal(start_date.strftime('%Y%m%d'), trade_date))
+        return all_trade_dates[-days:]
 
-    def smart_sync_stk_factor(self, trade_date: str, lookback_days: int = 20) -> Tuple[int, int, str]:
+    def _sync_stk_factor_dates(self, trade_dates: List[str], ts_codes: List[str],
+                               timings: Dict[str, float] = None) -> Tuple[int, int, int, List[str]]:
+        """
+        流水线同步多个交易日的技术因子数据：获取、类型转换、落库三个阶段重叠执行，
+        每个交易日落库完成后立即计入结果
+
+        Args:
+            trade_dates: 交易日期列表
+            ts_codes: 股票代码列表
+            timings: 各阶段耗时累加器（fetch/convert/save，秒）
+
+        Returns:
+            (插入记录数, 更新记录数, 内容未变化跳过的记录数, 失败信息列表)
+        """
+        total_inserted = 0
+        total_updated = 0
+        total_skipped = 0
+        errors = []
+
+        if settings.INGEST_STREAM_CHUNK_ROWS > 0:
+            # 流式模式：逐日、逐页获取并落库，不在内存中保留整日数据
+            for td in trade_dates:
+                try:
+                    inserted, updated, skipped, error = self.stream_stk_factor_pro(
+                        td, ts_codes, settings.INGEST_STREAM_CHUNK_ROWS, timings
+                    )
+                except Exception as e:
+                    inserted, updated, skipped, error = 0, 0, 0, f"获取失败: {str(e)}"
+                total_inserted += inserted
+                total_updated += updated
+                total_skipped += skipped
+                if error:
+                    errors.append(f"{td}: {error}")
+            if errors:
+                logger.warning(f"{len(errors)}个交易日同步失败: {'; '.join(errors)}")
+            return total_inserted, total_updated, total_skipped, errors
+
+        pipeline = IngestPipeline(
+            fetch=lambda td: self.fetch_stk_factor_pro_data(td, ts_codes, convert=False),
+            convert=lambda td, df: self._convert_data_types(df, 'stk_factor_pro'),
+            save=lambda td, df: self.save_stk_factor_pro_data(df, td) if not df.empty else (0, 0, 0, ""),
+            fetch_workers=settings.TUSHARE_FETCH_WORKERS,
+            queue_size=settings.INGEST_PIPELINE_QUEUE_SIZE
+        )
+        for stage in pipeline.run(trade_dates):
+            self._add_timings(timings, stage.timings)
+            if stage.error:
+                errors.append(f"{stage.item}: {stage.error}")
+                continue
+            inserted, updated, skipped, error = stage.result
+            total_inserted += inserted
+            total_updated += updated
+            total_skipped += skipped
+            if error:
+                errors.append(f"{stage.item}: {error}")
+
+        if errors:
+            logger.warning(f"{len(errors)}个交易日同步失败: {'; '.join(errors)}")
+        return total_inserted, total_updated, total_skipped, errors
+
+    @staticmethod
+    def _add_timings(total: Optional[Dict[str, float]], timings: Dict[str, float]):
+        """累加各阶段耗时"""
+        if total is None:
+            return
+        for stage, seconds in timings.items():
+            total[stage] = total.get(stage, 0.0) + seconds
+
+    def smart_sync_stk_factor(self, trade_date: str, lookback_days: int = 20,
+                              timings: Dict[str, float] = None) -> Tuple[int, int, int, str]:
         """
         智能同步技术因子数据（增量+存量，控制1万条上限）
 
         Args:
             trade_date: 当前交易日期
             lookback_days: 回溯天数
+            timings: 各阶段耗时累加器（fetch/convert/save，秒）
 
         Returns:
-            (插入记录数, 更新记录数, 错误信息)
+            (插入记录数, 更新记录数, 内容未变化跳过的记录数, 错误信息)
         """
         try:
             logger.info(f"开始智能同步技术因子数据，当前交易日: {trade_date}")
@@ -312,78 +441,56 @@ class TushareDataIntegrator:
 
             total_inserted = 0
             total_updated = 0
+            total_skipped = 0
+            errors = []
 
             if self.is_first_run():
                 logger.info("检测到首次运行，执行全量同步...")
-                end_date = datetime.strptime(trade_date, '%Y%m%d')
-                start_date = end_date - timedelta(days=lookback_days * 3)
-                all_trade_dates = self.get_trade_cal(start_date.strftime('%Y%m%d'), trade_date)
-                
-                all_trade_dates.sort()
-                
-                if len(all_trade_dates) >= lookback_days:
-                    trade_dates = all_trade_dates[-lookback_days:]
-                else:
-                    trade_dates = all_trade_dates
+                trade_dates = self.get_recent_trade_dates(trade_date, lookback_days)
 
                 logger.info(f"获取最近{len(trade_dates)}个交易日数据: {trade_dates[0]} 至 {trade_dates[-1]}")
                 total_records = len(all_ts_codes) * len(trade_dates)
                 logger.info(f"预计同步{total_records}条数据（{len(all_ts_codes)}只股票 × {len(trade_dates)}个交易日）")
                 
-                for td in trade_dates:
-                    df = self.fetch_stk_factor_pro_data(td, all_ts_codes)
-                    if not df.empty:
-                        inserted, updated, error = self.save_stk_factor_pro_data(df, td)
-                        total_inserted += inserted
-                        total_updated += updated
-                    time.sleep(0.5)
-
-                logger.info(f"全量同步完成: 插入{total_inserted}条，更新{total_updated}条")
+                total_inserted, total_updated, total_skipped, errors = self._sync_stk_factor_dates(
+                    trade_dates, all_ts_codes, timings
+                )
+
+                logger.info(f"全量同步完成: 插入{total_inserted}条，更新{total_updated}条，未变化{total_skipped}条")
             else:
                 new_stocks = self.get_new_stocks()
 
                 if new_stocks:
                     logger.info(f"为{len(new_stocks)}只新股票回溯{lookback_days}个交易日数据...")
-                    end_date = datetime.strptime(trade_date, '%Y%m%d')
-                    start_date = end_date - timedelta(days=lookback_days * 3)
-                    all_trade_dates = self.get_trade_cal(start_date.strftime('%Y%m%d'), trade_date)
-                    
-                    all_trade_dates.sort()
-                    
-                    if len(all_trade_dates) >= lookback_days:
-                        trade_dates = all_trade_dates[-lookback_days:]
-                    else:
-                        trade_dates = all_trade_dates
-
-                    for td in trade_dates:
-                        df = self.fetch_stk_factor_pro_data(td, new_stocks)
-                        if not df.empty:
-                            inserted, updated, error = self.save_stk_factor_pro_data(df, td)
-                            total_inserted += inserted
-                            total_updated += updated
-                        time.sleep(0.5)
+                    trade_dates = self.get_recent_trade_dates(trade_date, lookback_days)
+
+                    total_inserted, total_updated, total_skipped, errors = self._sync_stk_factor_dates(
+                        trade_dates, new_stocks, timings
+                    )
 
                 logger.info(f"同步当天数据...")
-                df = self.fetch_stk_factor_pro_data(trade_date, all_ts_codes)
-                if not df.empty:
-                    inserted, updated, error = self.save_stk_factor_pro_data(df, trade_date)
-                    total_inserted += inserted
-                    total_updated += updated
+                inserted, updated, skipped, day_errors = self._sync_stk_factor_dates([trade_date], all_ts_codes, timings)
+                total_inserted += inserted
+                total_updated += updated
+                total_skipped += skipped
+                errors.extend(day_errors)
 
-            return total_inserted, total_updated, ""
+            return total_inserted, total_updated, total_skipped, "; ".join(errors)
 
         except Exception as e:
             error_msg = f"智能同步技术因子数据失败: {str(e)}"
             logger.error(error_msg)
-            return 0, 0, error_msg
+            return 0, 0, 0, error_msg
 
-    def fetch_bak_daily_data(self, trade_date: str, ts_codes: List[str] = None) -> pd.DataFrame:
+    def fetch_bak_daily_data(self, trade_date: str, ts_codes: List[str] = None,
+                             convert: bool = True) -> pd.DataFrame:
         """
         获取备用行情数据
 
         Args:
             trade_date: 交易日期(YYYYMMDD格式)
             ts_codes: 股票代码列表（从stock_list获取）
+            convert: 是否做类型转换（流水线中由转换阶段单独处理时传False）
 
         Returns:
             备用行情数据DataFrame
@@ -391,7 +498,7 @@ class TushareDataIntegrator:
         try:
             logger.info(f"开始获取{trade_date}的备用行情数据...")
 
-            df = self.pro.bak_daily(trade_date=trade_date)
+            df = self._call_api('bak_daily', trade_date=trade_date)
 
             if df is None or len(df) == 0:
                 logger.warning(f"{trade_date}没有获取到备用行情数据")
@@ -400,7 +507,8 @@ class TushareDataIntegrator:
             if ts_codes:
                 df = df[df['ts_code'].isin(ts_codes)]
             
-            df = self._convert_data_types(df, 'bak_daily')
+            if convert:
+                df = self._convert_data_types(df, 'bak_daily')
 
             logger.info(f"成功获取{trade_date}的备用行情数据，共{len(df)}条记录")
             return df
@@ -409,13 +517,24 @@ class TushareDataIntegrator:
             logger.error(f"获取备用行情数据失败: {str(e)}")
             raise
 
-    def fetch_stk_factor_pro_data(self, trade_date: str, ts_codes: List[str] = None) -> pd.DataFrame:
+    def _stk_factor_fields_param(self) -> Dict[str, str]:
+        """
+        stk_factor_pro 的 fields 参数：按列配置只请求需要的列；
+        开启全量归档时仍请求全部列，归档后再投影
+        """
+        if self.stk_factor_fields is None or self.factor_archive is not None:
+            return {}
+        return {'fields': ','.join(self.stk_factor_fields)}
+
+    def fetch_stk_factor_pro_data(self, trade_date: str, ts_codes: List[str] = None,
+                                  convert: bool = True) -> pd.DataFrame:
         """
         获取技术面因子数据（分批处理，单次上限1万条）
 
         Args:
             trade_date: 交易日期(YYYYMMDD格式)
             ts_codes: 股票代码列表（从stock_list获取）
+            convert: 是否做类型转换（流水线中由转换阶段单独处理时传False）
 
         Returns:
             技术面因子数据DataFrame
@@ -432,28 +551,34 @@ class TushareDataIntegrator:
                     batch_codes = ts_codes[i:i + batch_size]
                     logger.info(f"获取第{i//batch_size + 1}批数据，代码数量: {len(batch_codes)}")
                     
-                    df_batch = self.pro.stk_factor_pro(trade_date=trade_date, ts_code=','.join(batch_codes))
+                    df_batch = self._call_api('stk_factor_pro', trade_date=trade_date, ts_code=','.join(batch_codes),
+                                             **self._stk_factor_fields_param())
                     
                     if df_batch is not None and len(df_batch) > 0:
                         all_data.append(df_batch)
-                    
-                    time.sleep(0.5)
                 
                 if all_data:
+                    # 按代码分批请求的结果不是全市场数据，不归档
                     df = pd.concat(all_data, ignore_index=True)
                 else:
                     return pd.DataFrame()
             else:
-                df = self.pro.stk_factor_pro(trade_date=trade_date)
+                df = self._call_api('stk_factor_pro', trade_date=trade_date, **self._stk_factor_fields_param())
                 
                 if df is None or len(df) == 0:
                     logger.warning(f"{trade_date}没有获取到技术面因子数据")
                     return pd.DataFrame()
-                
+
+                # 按 ts_codes 过滤前归档全市场数据（新股回溯只落库少量股票，不能覆盖整日归档）
+                self._archive_stk_factor(df, trade_date)
+
                 if ts_codes:
                     df = df[df['ts_code'].isin(ts_codes)]
             
-            df = self._convert_data_types(df, 'stk_factor_pro')
+            df = self._project_stk_factor(df)
+
+            if convert:
+                df = self._convert_data_types(df, 'stk_factor_pro')
 
             logger.info(f"成功获取{trade_date}的技术面因子数据，共{len(df)}条记录")
             return df
@@ -462,125 +587,250 @@ class TushareDataIntegrator:
             logger.error(f"获取技术面因子数据失败: {str(e)}")
             raise
 
-    def _clean_nan_values(self, df: pd.DataFrame) -> pd.DataFrame:
+    def _archive_stk_factor(self, df: pd.DataFrame, trade_date: str, part: Optional[int] = None):
+        """归档接口返回的全部列（仅在按列配置投影且开启归档时），只应传入未按代码过滤的全市场数据"""
+        if self.stk_factor_fields is not None and self.factor_archive is not None:
+            self.factor_archive.write('stk_factor_pro', trade_date, df, part)
+
+    def _project_stk_factor(self, df: pd.DataFrame) -> pd.DataFrame:
+        """按列配置投影技术因子数据"""
+        if self.stk_factor_fields is None:
+            return df
+        return df[[col for col in self.stk_factor_fields if col in df.columns]]
+
+    def iter_stk_factor_pro_chunks(self, trade_date: str, ts_codes: List[str] = None,
+                                   chunk_rows: int = 5000) -> Iterator[pd.DataFrame]:
         """
-        彻底清理DataFrame中的NaN/NA值，替换为None（适配MySQL的NULL）
+        分页获取单个交易日的技术面因子数据，逐页产出（未做类型转换）
+
+        按 limit/offset 分页请求全市场数据，每页归档后按 ts_codes 过滤、按列配置投影并立即产出，
+        调用方处理完一页再请求下一页，内存中只保留一页数据。
 
         Args:
-            df: 原始DataFrame
+            trade_date: 交易日期(YYYYMMDD格式)
+            ts_codes: 股票代码列表（为空时不过滤）
+            chunk_rows: 每页行数（接口单次上限1万行）
+
+        Yields:
+            单页数据DataFrame（过滤后可能为空）
+        """
+        chunk_rows = max(1, min(chunk_rows, 10000))
+        codes = set(ts_codes) if ts_codes else None
+        offset = 0
+        part = 0
+        while True:
+            df = self._call_api('stk_factor_pro', trade_date=trade_date, limit=chunk_rows, offset=offset,
+                                **self._stk_factor_fields_param())
+            page_rows = 0 if df is None else len(df)
+            if page_rows == 0:
+                return
+
+            # 每页都是全市场数据：过滤前归档，按代码过滤的回溯同步不会用少量股票覆盖整日归档
+            self._archive_stk_factor(df, trade_date, part)
+            if codes is not None:
+                df = df[df['ts_code'].isin(codes)]
+            yield self._project_stk_factor(df)
+
+            if page_rows < chunk_rows:
+                return
+            offset += page_rows
+            part += 1
+
+    def stream_stk_factor_pro(self, trade_date: str, ts_codes: List[str] = None, chunk_rows: int = 5000,
+                              timings: Dict[str, float] = None) -> Tuple[int, int, int, str]:
+        """
+        流式同步单个交易日的技术面因子数据：每页获取后立即转换并落库（每页单独提交）
+
+        Args:
+            trade_date: 交易日期(YYYYMMDD格式)
+            ts_codes: 股票代码列表
+            chunk_rows: 每页行数
+            timings: 各阶段耗时累加器（fetch/convert/save，秒）
 
         Returns:
-            清理后的DataFrame
+            (插入记录数, 更新记录数, 内容未变化跳过的记录数, 错误信息)
         """
-        try:
-            # 1. 替换numpy的nan、inf、-inf为None
-            df = df.replace({
-                np.nan: None,
-                np.inf: None,
-                -np.inf: None
-            })
+        total_inserted = 0
+        total_updated = 0
+        total_skipped = 0
+        errors = []
+        records = 0
+
+        chunks = self.iter_stk_factor_pro_chunks(trade_date, ts_codes, chunk_rows)
+        while True:
+            start = time.perf_counter()
+            df = next(chunks, None)
+            self._add_timings(timings, {'fetch': time.perf_counter() - start})
+            if df is None:
+                break
+            if df.empty:
+                continue
 
-            # 2. 处理pandas的NA值
-            df = df.where(pd.notna(df), None)
+            start = time.perf_counter()
+            df = self._convert_data_types(df, 'stk_factor_pro')
+            self._add_timings(timings, {'convert': time.perf_counter() - start})
 
-            # 3. 遍历检查所有值，确保没有遗漏的NaN
-            for col in df.columns:
-                df[col] = df[col].apply(lambda x: None if (isinstance(x, float) and np.isnan(x)) else x)
+            start = time.perf_counter()
+            inserted, updated, skipped, error = self.save_stk_factor_pro_data(df, trade_date)
+            self._add_timings(timings, {'save': time.perf_counter() - start})
 
-            return df
-        except Exception as e:
-            logger.error(f"清理NaN值失败: {str(e)}")
-            raise
+            records += len(df)
+            total_inserted += inserted
+            total_updated += updated
+            total_skipped += skipped
+            if error:
+                errors.append(error)
+            del df
+
+        logger.info(f"{trade_date}技术面因子数据流式同步完成: 共{records}条，新增{total_inserted}行，"
+                    f"更新{total_updated}行，未变化{total_skipped}行")
+        return total_inserted, total_updated, total_skipped, "; ".join(errors)
 
     def _convert_data_types(self, df: pd.DataFrame, data_type: str) -> pd.DataFrame:
         """
-        转换数据类型并清理NaN值
+        按列类型声明转换数据类型（见 scheduler.tushare_schema），缺失/非法/无穷值统一为NA
 
         Args:
             df: 原始DataFrame
             data_type: 数据类型(bak_daily或stk_factor_pro)
 
         Returns:
-            转换后的DataFrame
+            转换后的DataFrame，落库时由 ColumnSchema.to_rows 将NA转为None
         """
         try:
             if df.empty:
                 return df
-
-            # 先清理NaN值
-            df = self._clean_nan_values(df)
-
-            if data_type == 'bak_daily':
-                # 数值字段转换
-                numeric_cols = [
-                    'pct_change', 'close', 'price_change', 'open_price', 'high_price', 'low_price',
-                    'pre_close', 'vol_ratio', 'turn_over', 'swing', 'vol', 'amount',
-                    'selling', 'buying', 'total_share', 'float_share', 'pe', 'float_mv',
-                    'total_mv', 'avg_price', 'strength', 'activity', 'avg_turnover', 'attack',
-                    'interval_3', 'interval_6'
-                ]
-                for col in numeric_cols:
-                    if col in df.columns:
-                        # 转换为数值类型，错误值转为None
-                        df[col] = pd.to_numeric(df[col], errors='coerce')
-                        # 再次清理转换后产生的NaN
-                        df[col] = df[col].apply(lambda x: None if pd.isna(x) else x)
-
-                # 整数字段转换（使用Nullable Integer类型）
-                int_cols = ['vol', 'selling', 'buying']
-                for col in int_cols:
-                    if col in df.columns:
-                        # 先转换为数值，再转为Nullable int
-                        df[col] = pd.to_numeric(df[col], errors='coerce')
-                        df[col] = df[col].astype('Int64', errors='ignore')
-                        # NaN转为None
-                        df[col] = df[col].apply(lambda x: None if pd.isna(x) else x)
-
-            elif data_type == 'stk_factor_pro':
-                # 获取所有数值列
-                numeric_cols = df.select_dtypes(include=['float64', 'int64']).columns.tolist()
-
-                # 排除ts_code和trade_date
-                exclude_cols = ['ts_code', 'trade_date']
-                numeric_cols = [col for col in numeric_cols if col not in exclude_cols]
-
-                # 转换数值类型
-                for col in numeric_cols:
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
-                    df[col] = df[col].apply(lambda x: None if pd.isna(x) else x)
-
-                # 整数字段
-                int_cols = ['updays', 'downdays', 'vol']
-                for col in int_cols:
-                    if col in df.columns:
-                        df[col] = pd.to_numeric(df[col], errors='coerce')
-                        df[col] = df[col].astype('Int64', errors='ignore')
-                        df[col] = df[col].apply(lambda x: None if pd.isna(x) else x)
-
-            return df
+            return SCHEMAS[data_type].normalize(df)
 
         except Exception as e:
             logger.error(f"数据类型转换失败: {str(e)}")
             raise
 
-    def _escape_mysql_keywords(self, column_name: str) -> str:
+    def _write_rows(self, writer: BulkWriter, cursor, rows: List[tuple]) -> int:
+        """
+        写入一批数据：开启bulk_load且行数达到阈值时走 LOAD DATA，失败则回退到多行INSERT
+
+        Args:
+            writer: 目标表写入器
+            cursor: DB-API游标
+            rows: 行元组
+
+        Returns:
+            affected rows
+        """
+        if self.bulk_load and len(rows) >= settings.INGEST_LOAD_DATA_MIN_ROWS:
+            try:
+                start = time.perf_counter()
+                affected = writer.load(cursor, rows)
+                logger.info(f"{writer.table} LOAD DATA 导入{len(rows)}条，耗时{time.perf_counter() - start:.2f}秒")
+                return affected
+            except Exception as e:
+                # 服务端未开启local_infile等情况：本进程内不再尝试，回退到INSERT
+                logger.warning(f"{writer.table} LOAD DATA 失败，回退到INSERT: {str(e)}")
+                self.bulk_load = False
+        return writer.write(cursor, rows)
+
+    def _has_row_hash(self, cursor, table: str) -> bool:
+        """
+        表中是否已有 row_hash 列（每张表只检查一次）
+
+        升级前的库没有该列时不写入哈希、不做差异比对，避免落库因列不存在而失败。
+
+        Args:
+            cursor: DB-API游标
+            table: 表名
+
+        Returns:
+            是否有 row_hash 列
+        """
+        if table not in self._row_hash_tables:
+            cursor.execute(f"SHOW COLUMNS FROM {table} LIKE 'row_hash'")
+            exists = cursor.fetchone() is not None
+            if not exists:
+                logger.warning(
+                    f"{table} 缺少 row_hash 列，按全量写入且不跳过未变化的行；"
+                    f"请执行 sql/basic 下对应建表脚本中的升级语句"
+                )
+            self._row_hash_tables[table] = exists
+        return self._row_hash_tables[table]
+
+    def _changed_rows(self, cursor, schema, df: pd.DataFrame, columns: List[str],
+                      trade_date: str) -> Tuple[List[tuple], int, int, int, bool]:
         """
-        转义MySQL保留关键字字段名
+        差异比对：计算逐行内容哈希，与库中同一交易日的 row_hash 比较，只保留新增或变化的行
+
+        未开启 INGEST_SKIP_UNCHANGED 或表中没有 row_hash 列时写入全部行，
+        新增/更新行数仍按库中已有的 ts_code 统计。
 
         Args:
-            column_name: 原始字段名
+            cursor: DB-API游标
+            schema: 表的列类型声明
+            df: normalize 之后的DataFrame
+            columns: 落库列（不含row_hash）
+            trade_date: 交易日期
 
         Returns:
-            转义后的字段名（用反引号包裹）
+            (待写入的行元组, 新增行数, 更新行数, 未变化跳过的行数, 行元组末尾是否带row_hash)
         """
-        # MySQL常见保留关键字列表（重点处理当前遇到的）
-        reserved_keywords = {'change', 'open', 'close', 'high', 'low', 'desc', 'order', 'limit'}
+        with_hash = self._has_row_hash(cursor, schema.table)
+        skip_unchanged = self.skip_unchanged and with_hash
+
+        if skip_unchanged:
+            cursor.execute(f"SELECT ts_code, row_hash FROM {schema.table} WHERE trade_date = %s", [trade_date])
+            existing = {ts_code: row_hash for ts_code, row_hash in cursor.fetchall()}
+        else:
+            cursor.execute(f"SELECT ts_code FROM {schema.table} WHERE trade_date = %s", [trade_date])
+            existing = {row[0]: None for row in cursor.fetchall()}
+
+        absent = object()
+        previous = [existing.get(code, absent) for code in df['ts_code'].to_numpy(dtype=object)]
+        is_new = np.array([value is absent for value in previous], dtype=bool)
+        hashes = schema.row_hashes(df, columns) if with_hash else None
+
+        if skip_unchanged:
+            # row_hash 为NULL（升级前写入的行）时按变化处理
+            is_changed = np.array(
+                [value is not absent and (value is None or int(value) != int(h)) for value, h in zip(previous, hashes)],
+                dtype=bool
+            )
+        else:
+            is_changed = ~is_new
 
-        if column_name.lower() in reserved_keywords:
-            return f"`{column_name}`"
-        return column_name
+        keep = is_new | is_changed
+        _, rows = schema.to_rows(df[keep], columns)
+        if with_hash:
+            rows = [row + (int(h),) for row, h in zip(rows, hashes[keep])]
 
-    def save_bak_daily_data(self, df: pd.DataFrame, trade_date: str) -> Tuple[int, int, str]:
+        skipped = len(df) - int(keep.sum())
+        if skipped:
+            logger.info(f"{schema.table} {trade_date}: {skipped}行内容未变化，跳过写入")
+        return rows, int(is_new.sum()), int(is_changed.sum()), skipped, with_hash
+
+    def _get_writer(self, table: str, columns: List[str], with_hash: bool) -> BulkWriter:
+        """
+        按表、列组合缓存的写入器（stk_factor_pro 的列随接口返回变化）
+
+        Args:
+            table: 表名
+            columns: 落库列（不含row_hash）
+            with_hash: 是否写入 row_hash 列
+
+        Returns:
+            BulkWriter
+        """
+        key = (table, tuple(columns), with_hash)
+        writer = self._writers.get(key)
+        if writer is None:
+            extra = ['row_hash'] if with_hash else []
+            writer = BulkWriter(
+                table, list(columns) + extra,
+                update_columns=[col for col in columns if col not in ('ts_code', 'trade_date')] + extra,
+                batch_size=500
+            )
+            self._writers[key] = writer
+        return writer
+
+    def save_bak_daily_data(self, df: pd.DataFrame, trade_date: str) -> Tuple[int, int, int, str]:
         """
         保存备用行情数据到数据库（批量插入/更新）
 
@@ -589,68 +839,28 @@ class TushareDataIntegrator:
             trade_date: 交易日期
 
         Returns:
-            (插入记录数, 更新记录数, 错误信息)
+            (插入记录数, 更新记录数, 内容未变化跳过的记录数, 错误信息)
         """
         try:
             if len(df) == 0:
-                return 0, 0, "没有数据"
+                return 0, 0, 0, "没有数据"
 
             logger.info(f"开始批量保存{trade_date}的备用行情数据，共{len(df)}条...")
 
-            df_clean = df.replace({np.nan: None, np.inf: None, -np.inf: None})
-            
-            columns = ['ts_code', 'trade_date', 'name', 'pct_change', 'close', 'change',
-                      'open', 'high', 'low', 'pre_close', 'vol_ratio', 'turn_over',
-                      'swing', 'vol', 'amount', 'selling', 'buying', 'total_share', 
-                      'float_share', 'pe', 'industry', 'area', 'float_mv', 'total_mv', 
-                      'avg_price', 'strength', 'activity', 'avg_turnover', 'attack', 
-                      'interval_3', 'interval_6']
-            
-            values_list = []
-            for _, row in df_clean.iterrows():
-                values = tuple(row.get(col) for col in columns)
-                values_list.append(values)
-
-            batch_size = 500
-            total_affected = 0
-
             raw_conn = self.engine.raw_connection()
             try:
                 cursor = raw_conn.cursor()
                 try:
-                    for i in range(0, len(values_list), batch_size):
-                        batch = values_list[i:i + batch_size]
-                        placeholders = ','.join(['(%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)'] * len(batch))
-                        flat_values = [v for row in batch for v in row]
-                        
-                        sql = f"""
-                            INSERT INTO bak_daily_data 
-                            (ts_code, trade_date, name, pct_change, `close`, `change`,
-                            `open`, `high`, `low`, pre_close, vol_ratio, turn_over,
-                            swing, vol, amount, selling, buying, total_share, float_share, pe,
-                            industry, area, float_mv, total_mv, avg_price, strength, activity,
-                            avg_turnover, attack, interval_3, interval_6)
-                            VALUES {placeholders}
-                            ON DUPLICATE KEY UPDATE
-                            name=VALUES(name), pct_change=VALUES(pct_change), `close`=VALUES(`close`),
-                            `change`=VALUES(`change`), `open`=VALUES(`open`), `high`=VALUES(`high`),
-                            `low`=VALUES(`low`), pre_close=VALUES(pre_close), vol_ratio=VALUES(vol_ratio),
-                            turn_over=VALUES(turn_over), swing=VALUES(swing), vol=VALUES(vol),
-                            amount=VALUES(amount), selling=VALUES(selling), buying=VALUES(buying),
-                            total_share=VALUES(total_share), float_share=VALUES(float_share), pe=VALUES(pe),
-                            industry=VALUES(industry), area=VALUES(area), float_mv=VALUES(float_mv),
-                            total_mv=VALUES(total_mv), avg_price=VALUES(avg_price), strength=VALUES(strength),
-                            activity=VALUES(activity), avg_turnover=VALUES(avg_turnover), attack=VALUES(attack),
-                            interval_3=VALUES(interval_3), interval_6=VALUES(interval_6)
-                        """
-                        
-                        cursor.execute(sql, flat_values)
-                        total_affected += cursor.rowcount
-                        logger.info(f"批次{i//batch_size + 1}: 处理{len(batch)}条")
+                    values_list, inserted, updated, skipped, with_hash = self._changed_rows(
+                        cursor, BAK_DAILY_SCHEMA, df, BAK_DAILY_SCHEMA.columns, trade_date
+                    )
+                    if values_list:
+                        writer = self._get_writer(BAK_DAILY_SCHEMA.table, BAK_DAILY_SCHEMA.columns, with_hash)
+                        self._write_rows(writer, cursor, values_list)
 
                     raw_conn.commit()
-                    logger.info(f"备用行情数据保存完成: 共影响{total_affected}行")
-                    return total_affected, 0, ""
+                    logger.info(f"备用行情数据保存完成: 新增{inserted}行，更新{updated}行，未变化{skipped}行")
+                    return inserted, updated, skipped, ""
 
                 except Exception as e:
                     raw_conn.rollback()
@@ -664,9 +874,9 @@ class TushareDataIntegrator:
         except Exception as e:
             error_msg = f"保存备用行情数据失败: {str(e)}"
             logger.error(error_msg)
-            return 0, 0, error_msg
+            return 0, 0, 0, error_msg
 
-    def save_stk_factor_pro_data(self, df: pd.DataFrame, trade_date: str) -> Tuple[int, int, str]:
+    def save_stk_factor_pro_data(self, df: pd.DataFrame, trade_date: str) -> Tuple[int, int, int, str]:
         """
         保存技术面因子数据到数据库（批量插入/更新）
 
@@ -675,58 +885,30 @@ class TushareDataIntegrator:
             trade_date: 交易日期
 
         Returns:
-            (插入记录数, 更新记录数, 错误信息)
+            (插入记录数, 更新记录数, 内容未变化跳过的记录数, 错误信息)
         """
         try:
             if len(df) == 0:
-                return 0, 0, "没有数据"
+                return 0, 0, 0, "没有数据"
 
             logger.info(f"开始批量保存{trade_date}的技术面因子数据，共{len(df)}条...")
 
-            df_clean = df.replace({np.nan: None, np.inf: None, -np.inf: None})
-            
-            columns = [col for col in df_clean.columns]
-            escaped_columns = [self._escape_mysql_keywords(col) for col in columns]
-            
-            values_list = []
-            for _, row in df_clean.iterrows():
-                values = tuple(row.get(col) for col in columns)
-                values_list.append(values)
-
-            batch_size = 500
-            total_affected = 0
-            num_fields = len(columns)
+            columns = STK_FACTOR_PRO_SCHEMA.columns_for(df)
 
             raw_conn = self.engine.raw_connection()
             try:
                 cursor = raw_conn.cursor()
                 try:
-                    for i in range(0, len(values_list), batch_size):
-                        batch = values_list[i:i + batch_size]
-                        placeholder = '(' + ','.join(['%s'] * num_fields) + ')'
-                        placeholders = ','.join([placeholder] * len(batch))
-                        flat_values = [v for row in batch for v in row]
-                        
-                        update_clauses = []
-                        for escaped_col, col in zip(escaped_columns, columns):
-                            if col not in ['ts_code', 'trade_date']:
-                                update_clauses.append(f"{escaped_col}=VALUES({escaped_col})")
-                        update_clause_str = ', '.join(update_clauses)
-                        
-                        sql = f"""
-                            INSERT INTO stk_factor_pro_data 
-                            ({', '.join(escaped_columns)})
-                            VALUES {placeholders}
-                            ON DUPLICATE KEY UPDATE {update_clause_str}
-                        """
-                        
-                        cursor.execute(sql, flat_values)
-                        total_affected += cursor.rowcount
-                        logger.info(f"批次{i//batch_size + 1}: 处理{len(batch)}条")
+                    values_list, inserted, updated, skipped, with_hash = self._changed_rows(
+                        cursor, STK_FACTOR_PRO_SCHEMA, df, columns, trade_date
+                    )
+                    if values_list:
+                        writer = self._get_writer(STK_FACTOR_PRO_SCHEMA.table, columns, with_hash)
+                        self._write_rows(writer, cursor, values_list)
 
                     raw_conn.commit()
-                    logger.info(f"技术面因子数据保存完成: 共影响{total_affected}行")
-                    return total_affected, 0, ""
+                    logger.info(f"技术面因子数据保存完成: 新增{inserted}行，更新{updated}行，未变化{skipped}行")
+                    return inserted, updated, skipped, ""
 
                 except Exception as e:
                     raw_conn.rollback()
@@ -740,11 +922,12 @@ class TushareDataIntegrator:
         except Exception as e:
             error_msg = f"保存技术面因子数据失败: {str(e)}"
             logger.error(error_msg)
-            return 0, 0, error_msg
+            return 0, 0, 0, error_msg
 
     def log_integration_result(self, trade_date: str, data_type: str, status: str,
                                total_records: int, inserted: int, updated: int,
-                               error_message: str = "", duration_seconds: int = 0):
+                               error_message: str = "", duration_seconds: int = 0,
+                               stage_seconds: Dict[str, float] = None, skipped: int = 0):
         """
         记录数据集成结果
 
@@ -757,16 +940,21 @@ class TushareDataIntegrator:
             updated: 更新记录数
             error_message: 错误信息
             duration_seconds: 耗时(秒)
+            stage_seconds: 流水线各阶段耗时（fetch/convert/save，秒）
+            skipped: 内容未变化、跳过写入的记录数
         """
+        stage_seconds = stage_seconds or {}
         try:
             with self.engine.connect() as conn:
                 insert_sql = text("""
                     INSERT INTO data_integration_log (
                         trade_date, data_type, status, total_records, inserted_records,
-                        updated_records, error_message, end_time, duration_seconds
+                        updated_records, skipped_records, error_message, end_time, duration_seconds,
+                        fetch_seconds, convert_seconds, save_seconds
                     ) VALUES (
                         :trade_date, :data_type, :status, :total_records, :inserted_records,
-                        :updated_records, :error_message, NOW(), :duration_seconds
+                        :updated_records, :skipped_records, :error_message, NOW(), :duration_seconds,
+                        :fetch_seconds, :convert_seconds, :save_seconds
                     )
                 """)
                 conn.execute(insert_sql, {
@@ -776,8 +964,12 @@ class TushareDataIntegrator:
                     'total_records': total_records,
                     'inserted_records': inserted,
                     'updated_records': updated,
+                    'skipped_records': skipped,
                     'error_message': error_message,
-                    'duration_seconds': duration_seconds
+                    'duration_seconds': duration_seconds,
+                    'fetch_seconds': stage_seconds.get('fetch'),
+                    'convert_seconds': stage_seconds.get('convert'),
+                    'save_seconds': stage_seconds.get('save')
                 })
                 conn.commit()
         except Exception as e:
@@ -796,8 +988,8 @@ class TushareDataIntegrator:
         result = {
             'trade_date': trade_date,
             'stock_list': {'status': 'failed', 'inserted': 0, 'updated': 0, 'error': ''},
-            'bak_daily': {'status': 'failed', 'inserted': 0, 'updated': 0, 'error': ''},
-            'stk_factor_pro': {'status': 'failed', 'inserted': 0, 'updated': 0, 'error': ''}
+            'bak_daily': {'status': 'failed', 'inserted': 0, 'updated': 0, 'skipped': 0, 'error': ''},
+            'stk_factor_pro': {'status': 'failed', 'inserted': 0, 'updated': 0, 'skipped': 0, 'error': ''}
         }
 
         try:
@@ -830,23 +1022,32 @@ class TushareDataIntegrator:
             start_time = datetime.now()
             try:
                 ts_codes = stock_list_df['ts_code'].tolist() if not stock_list_df.empty else None
-                bak_daily_df = self.fetch_bak_daily_data(trade_date, ts_codes)
-                inserted, updated, error = self.save_bak_daily_data(bak_daily_df, trade_date)
+                pipeline = IngestPipeline(
+                    fetch=lambda td: self.fetch_bak_daily_data(td, ts_codes, convert=False),
+                    convert=lambda td, df: self._convert_data_types(df, 'bak_daily'),
+                    save=lambda td, df: self.save_bak_daily_data(df, td)
+                )
+                stage = list(pipeline.run([trade_date]))[0]
+                if stage.error:
+                    raise RuntimeError(stage.error)
+                inserted, updated, skipped, error = stage.result
+                bak_daily_total = stage.records
                 duration = int((datetime.now() - start_time).total_seconds())
 
-                status = 'success' if (inserted + updated) > 0 else 'failed'
-                if error and (inserted + updated) > 0:
-                    status = 'partial'
+                # 内容未变化时新增/更新均为0，仍视为成功
+                status = 'success' if not error else ('partial' if (inserted + updated) > 0 else 'failed')
 
                 result['bak_daily'] = {
                     'status': status,
                     'inserted': inserted,
                     'updated': updated,
+                    'skipped': skipped,
                     'error': error,
-                    'total': len(bak_daily_df)
+                    'total': bak_daily_total
                 }
                 self.log_integration_result(trade_date, 'bak_daily', status,
-                                            len(bak_daily_df), inserted, updated, error, duration)
+                                            bak_daily_total, inserted, updated, error, duration, stage.timings,
+                                            skipped=skipped)
             except Exception as e:
                 error_msg = f"备用行情数据集成失败: {str(e)}"
                 result['bak_daily']['error'] = error_msg
@@ -855,22 +1056,24 @@ class TushareDataIntegrator:
             # 3. 智能同步技术面因子数据
             start_time = datetime.now()
             try:
-                inserted, updated, error = self.smart_sync_stk_factor(trade_date)
+                stk_factor_timings = {}
+                inserted, updated, skipped, error = self.smart_sync_stk_factor(trade_date, timings=stk_factor_timings)
                 duration = int((datetime.now() - start_time).total_seconds())
 
-                status = 'success' if (inserted + updated) > 0 else 'failed'
-                if error and (inserted + updated) > 0:
-                    status = 'partial'
+                # 内容未变化时新增/更新均为0，仍视为成功
+                status = 'success' if not error else ('partial' if (inserted + updated) > 0 else 'failed')
 
                 result['stk_factor_pro'] = {
                     'status': status,
                     'inserted': inserted,
                     'updated': updated,
+                    'skipped': skipped,
                     'error': error,
-                    'total': inserted + updated
+                    'total': inserted + updated + skipped
                 }
                 self.log_integration_result(trade_date, 'stk_factor_pro', status,
-                                            inserted + updated, inserted, updated, error, duration)
+                                            inserted + updated + skipped, inserted, updated, error, duration,
+                                            stk_factor_timings, skipped=skipped)
             except Exception as e:
                 error_msg = f"技术面因子数据集成失败: {str(e)}"
                 result['stk_factor_pro']['error'] = error_msg
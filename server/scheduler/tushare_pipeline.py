@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据落库流水线：获取 → 类型转换 → 落库 三个阶段由有界队列连接
+网络获取（多个线程）、类型转换（单独线程）和数据库写入（调用方线程）同时进行，
+第N+1个交易日的获取与第N个交易日的转换、落库重叠。
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StageResult:
+    """单个任务（通常是一个交易日）在流水线中的结果"""
+    item: Any
+    result: Any = None
+    error: Optional[str] = None
+    records: int = 0
+    timings: Dict[str, float] = field(default_factory=lambda: {'fetch': 0.0, 'convert': 0.0, 'save': 0.0})
+
+
+class IngestPipeline:
+    """
+    三阶段落库流水线
+
+    fetch(item) -> 原始数据；convert(item, 原始数据) -> 可落库数据；save(item, 可落库数据) -> 任意结果。
+    获取阶段最多 fetch_workers 个并发，阶段之间的队列长度为 queue_size，
+    下游处理不过来时上游阻塞，内存中最多积压 fetch_workers + 2 * queue_size 个交易日的数据。
+    调用方提前结束迭代（break、异常、KeyboardInterrupt）时流水线随生成器关闭而停止，不会阻塞退出。
+    """
+
+    _DONE = object()
+    # 队列阻塞时检查停止标志的间隔（秒）
+    _POLL_SECONDS = 0.2
+
+    def __init__(self, fetch: Callable[[Any], Any], convert: Callable[[Any, Any], Any],
+                 save: Callable[[Any, Any], Any], fetch_workers: int = 2, queue_size: int = 2):
+        self.fetch = fetch
+        self.convert = convert
+        self.save = save
+        self.fetch_workers = fetch_workers
+        self.queue_size = queue_size
+
+    def run(self, items: Iterable[Any]) -> Iterator[StageResult]:
+        """
+        执行流水线，每个任务落库完成后立即产出其结果
+
+        Args:
+            items: 任务参数（如交易日期列表）
+
+        Yields:
+            StageResult，按落库完成顺序
+        """
+        items = list(items)
+        if not items:
+            return
+
+        fetched = queue.Queue(maxsize=self.queue_size)
+        converted = queue.Queue(maxsize=self.queue_size)
+        # 调用方提前结束（break/异常/Ctrl-C）时置位，阻塞在队列上的线程据此退出
+        stop = threading.Event()
+
+        def put(q: queue.Queue, obj) -> bool:
+            while not stop.is_set():
+                try:
+                    q.put(obj, timeout=self._POLL_SECONDS)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def get(q: queue.Queue):
+            while not stop.is_set():
+                try:
+                    return q.get(timeout=self._POLL_SECONDS)
+                except queue.Empty:
+                    continue
+            return self._DONE
+
+        def fetch_one(item):
+            if stop.is_set():
+                return
+            stage = StageResult(item)
+            start = time.perf_counter()
+            try:
+                stage.result = self.fetch(item)
+            except Exception as e:
+                stage.error = f"获取失败: {str(e)}"
+            stage.timings['fetch'] = time.perf_counter() - start
+            put(fetched, stage)
+
+        def convert_loop():
+            for _ in range(len(items)):
+                stage = get(fetched)
+                if stage is self._DONE:
+                    return
+                if stage.error is None:
+                    start = time.perf_counter()
+                    try:
+                        stage.result = self.convert(stage.item, stage.result)
+                    except Exception as e:
+                        stage.error = f"转换失败: {str(e)}"
+                        stage.result = None
+                    stage.timings['convert'] = time.perf_counter() - start
+                if not put(converted, stage):
+                    return
+            put(converted, self._DONE)
+
+        converter = threading.Thread(target=convert_loop, name='ingest-convert', daemon=True)
+        converter.start()
+
+        executor = ThreadPoolExecutor(max_workers=min(self.fetch_workers, len(items)),
+                                      thread_name_prefix='ingest-fetch')
+        try:
+            for item in items:
+                executor.submit(fetch_one, item)
+
+            while True:
+                stage = converted.get()
+                if stage is self._DONE:
+                    break
+                if stage.error is None:
+                    data = stage.result
+                    stage.records = len(data) if hasattr(data, '__len__') else 0
+                    start = time.perf_counter()
+                    try:
+                        stage.result = self.save(stage.item, data)
+                    except Exception as e:
+                        stage.error = f"落库失败: {str(e)}"
+                        stage.result = None
+                    stage.timings['save'] = time.perf_counter() - start
+                logger.info(
+                    f"{stage.item} 获取{stage.timings['fetch']:.2f}s 转换{stage.timings['convert']:.2f}s "
+                    f"落库{stage.timings['save']:.2f}s" + (f" 失败: {stage.error}" if stage.error else "")
+                )
+                yield stage
+        finally:
+            # 正常结束时所有线程均已完成；提前结束时通知线程退出、取消未开始的获取并丢弃积压数据，
+            # 不等待正在请求中的获取线程（其结果不再入队）
+            stop.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+            for q in (fetched, converted):
+                while True:
+                    try:
+                        q.get_nowait()
+                    except queue.Empty:
+                        break
+            converter.join()
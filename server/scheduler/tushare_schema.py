@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tushare落库表的列类型声明
+按列类型一次性完成类型转换和NULL处理，替代逐列/逐值的apply清洗
+"""
+
+from typing import Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+
+
+class ColumnSchema:
+    """
+    单张落库表的列类型声明
+
+    列分为三类：字符串列（原样保留）、整数列（BIGINT/INT）、数值列（DECIMAL）。
+    numeric_columns 为None时，除字符串列和整数列以外的所有列都按数值列处理，
+    用于 stk_factor_pro 这类列很多且几乎全部为DECIMAL的表。
+    """
+
+    def __init__(self, table: str, string_columns: Sequence[str], int_columns: Sequence[str],
+                 numeric_columns: Optional[Sequence[str]] = None, columns: Optional[Sequence[str]] = None):
+        """
+        Args:
+            table: 表名
+            string_columns: 字符串列
+            int_columns: 整数列
+            numeric_columns: 数值列，None表示其余全部列
+            columns: 落库列及顺序，None表示使用DataFrame自身的列
+        """
+        self.table = table
+        self.string_columns = frozenset(string_columns)
+        self.int_columns = frozenset(int_columns)
+        self.numeric_columns = frozenset(numeric_columns) if numeric_columns is not None else None
+        self.columns = list(columns) if columns is not None else None
+
+    def kind(self, column: str) -> str:
+        """列类型：string / int / numeric"""
+        if column in self.string_columns:
+            return 'string'
+        if column in self.int_columns:
+            return 'int'
+        if self.numeric_columns is None or column in self.numeric_columns:
+            return 'numeric'
+        return 'string'
+
+    def columns_for(self, df: pd.DataFrame) -> List[str]:
+        """落库列：声明了列顺序时按声明顺序，否则使用DataFrame的列"""
+        return list(self.columns) if self.columns is not None else list(df.columns)
+
+    def normalize(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        按声明转换列类型（数值列为float64，整数列为Int64，缺失/非法/无穷值统一为NA）
+
+        Args:
+            df: Tushare接口返回的原始DataFrame
+
+        Returns:
+            转换后的DataFrame
+        """
+        if df.empty:
+            return df
+
+        converted = {}
+        for col in df.columns:
+            kind = self.kind(col)
+            if kind == 'string':
+                continue
+            values = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+            values[~np.isfinite(values)] = np.nan
+            if kind == 'int':
+                converted[col] = pd.array(np.round(values), dtype='Float64').astype('Int64')
+            else:
+                converted[col] = values
+
+        if not converted:
+            return df
+        return df.assign(**converted)
+
+    def to_rows(self, df: pd.DataFrame, columns: Iterable[str] = None) -> Tuple[List[str], List[tuple]]:
+        """
+        将DataFrame转为可直接传给 cursor.execute 的元组列表，NaN/NA/inf 转为None
+
+        Args:
+            df: normalize 之后的DataFrame
+            columns: 落库列，默认 columns_for(df)
+
+        Returns:
+            (列名列表, 行元组列表)
+        """
+        columns = list(columns) if columns is not None else self.columns_for(df)
+        arrays = [self._column_values(df[col] if col in df.columns else None, len(df), self.kind(col))
+                  for col in columns]
+        return columns, list(zip(*arrays)) if arrays else []
+
+    def row_hashes(self, df: pd.DataFrame, columns: Iterable[str] = None) -> np.ndarray:
+        """
+        逐行内容哈希（uint64），用于判断已落库的行是否变化
+
+        数值列先按落库精度（最多4位小数）取整，避免接口返回的浮点尾差被识别为变化；
+        参与计算的列不同（如切换列配置）时哈希也不同。
+
+        Args:
+            df: normalize 之后的DataFrame
+            columns: 参与计算的列，默认 columns_for(df)
+
+        Returns:
+            与df行对应的哈希数组
+        """
+        columns = list(columns) if columns is not None else self.columns_for(df)
+        frame = {}
+        for col in columns:
+            if col not in df.columns:
+                frame[col] = pd.Series([None] * len(df), index=df.index, dtype=object)
+            elif self.kind(col) == 'numeric':
+                frame[col] = pd.to_numeric(df[col], errors='coerce').round(4)
+            else:
+                frame[col] = df[col]
+        # 列名也参与哈希，列集合变化时视为变化
+        salt = np.uint64(pd.util.hash_array(np.array(['|'.join(columns)], dtype=object))[0])
+        hashes = pd.util.hash_pandas_object(pd.DataFrame(frame, index=df.index), index=False).to_numpy()
+        return hashes ^ salt
+
+    @staticmethod
+    def _column_values(series: Optional[pd.Series], length: int, kind: str) -> np.ndarray:
+        """单列转为object数组：数值为Python int/float，缺失值为None"""
+        if series is None:
+            return np.full(length, None, dtype=object)
+
+        if kind == 'string':
+            values = series.to_numpy(dtype=object)
+            values[pd.isna(values)] = None
+            return values
+
+        numbers = pd.to_numeric(series, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+        missing = ~np.isfinite(numbers)
+        if kind == 'int':
+            values = np.where(missing, 0, np.round(numbers)).astype(np.int64).astype(object)
+        else:
+            values = numbers.astype(object)
+        values[missing] = None
+        return values
+
+
+BAK_DAILY_SCHEMA = ColumnSchema(
+    table='bak_daily_data',
+    string_columns=['ts_code', 'trade_date', 'name', 'industry', 'area'],
+    int_columns=['vol', 'selling', 'buying'],
+    numeric_columns=[
+        'pct_change', 'close', 'change', 'open', 'high', 'low', 'pre_close', 'vol_ratio',
+        'turn_over', 'swing', 'amount', 'total_share', 'float_share', 'pe', 'float_mv',
+        'total_mv', 'avg_price', 'strength', 'activity', 'avg_turnover', 'attack',
+        'interval_3', 'interval_6'
+    ],
+    columns=[
+        'ts_code', 'trade_date', 'name', 'pct_change', 'close', 'change',
+        'open', 'high', 'low', 'pre_close', 'vol_ratio', 'turn_over',
+        'swing', 'vol', 'amount', 'selling', 'buying', 'total_share',
+        'float_share', 'pe', 'industry', 'area', 'float_mv', 'total_mv',
+        'avg_price', 'strength', 'activity', 'avg_turnover', 'attack',
+        'interval_3', 'interval_6'
+    ]
+)
+
+# stk_factor_pro 约250列，除代码/日期和少数整数列外均为DECIMAL，按接口返回的列落库
+STK_FACTOR_PRO_SCHEMA = ColumnSchema(
+    table='stk_factor_pro_data',
+    string_columns=['ts_code', 'trade_date'],
+    int_columns=['vol', 'updays', 'downdays', 'lowdays', 'topdays']
+)
+
+# stk_factor_pro 列配置：full 为接口返回的全部列；b1 只保留B1信号计算和个股详情实际读取的列
+STK_FACTOR_PRO_PROFILES = {
+    'full': None,
+    'b1': (
+        'ts_code', 'trade_date',
+        'open', 'high', 'low', 'close', 'pct_chg', 'vol',
+        'kdj_qfq', 'kdj_k_qfq', 'kdj_d_qfq',
+        'macd_dif_qfq', 'macd_dea_qfq', 'macd_qfq',
+        'ma_qfq_5', 'ma_qfq_10', 'ma_qfq_20', 'ma_qfq_30',
+    ),
+}
+
+
+def get_stk_factor_pro_fields(profile: str) -> Optional[Tuple[str, ...]]:
+    """
+    列配置对应的字段列表
+
+    Args:
+        profile: 列配置名（full/b1）
+
+    Returns:
+        字段元组，None 表示全部列
+    """
+    if profile not in STK_FACTOR_PRO_PROFILES:
+        raise ValueError(f"未知的stk_factor_pro列配置: {profile}，可选 {tuple(STK_FACTOR_PRO_PROFILES)}")
+    return STK_FACTOR_PRO_PROFILES[profile]
+
+
+SCHEMAS = {
+    'bak_daily': BAK_DAILY_SCHEMA,
+    'stk_factor_pro': STK_FACTOR_PRO_SCHEMA,
+}
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+历史数据回补命令（可断点续跑）
+
+示例（在server目录下执行）：
+    python scripts/backfill.py --start 20240101 --end 20241231
+    python scripts/backfill.py --start 20240101 --end 20240131 --datasets stk_factor_pro --force
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scheduler.backfill_job import DATASETS, run_backfill
+
+
+def main():
+    parser = argparse.ArgumentParser(description='回补bak_daily/stk_factor_pro历史数据，已完成的交易日自动跳过')
+    parser.add_argument('--start', required=True, help='开始日期(YYYYMMDD)')
+    parser.add_argument('--end', required=True, help='结束日期(YYYYMMDD)')
+    parser.add_argument('--datasets', nargs='+', choices=DATASETS, default=list(DATASETS), help='回补的数据集')
+    parser.add_argument('--force', action='store_true', help='忽略断点，重新回补区间内所有交易日')
+    args = parser.parse_args()
+
+    try:
+        summary = run_backfill(args.start, args.end, args.datasets, force=args.force)
+    except KeyboardInterrupt:
+        print("回补已中断，重新执行将从未完成的交易日继续")
+        sys.exit(130)
+    failed = sum(len(item['failed']) for item in summary.values())
+    for dataset, item in summary.items():
+        print(f"{dataset}: 完成{item['done']}天，跳过{item['skipped']}天，无数据{len(item['empty'])}天，"
+              f"失败{len(item['failed'])}天" + (f" {item['failed']}" if item['failed'] else ""))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,268 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__, 'b1_signal_service.log')
+
+
+class HistoryMatrix:
+    """
+    历史行情矩阵（股票 × 交易日）
+
+    每个字段是一个 (股票数, 窗口天数) 的float数组，按交易日升序右对齐：
+    最后一列是最新交易日，历史不足窗口长度的股票左侧以NaN填充。
+    lengths 记录每只股票实际的历史天数，用于复现逐只计算时的长度判断。
+    """
+
+    FIELDS = ('pct_change', 'vol', 'amount')
+
+    def __init__(self, ts_codes: List[str], window: int, arrays: Dict[str, np.ndarray], lengths: np.ndarray):
+        self.ts_codes = list(ts_codes)
+        self.window = window
+        self.arrays = arrays
+        self.lengths = lengths
+
+        # 列号 >= start 的位置属于该股票的有效历史
+        self.start = window - lengths
+        self.columns = np.arange(window)
+        self.valid = self.columns[None, :] >= self.start[:, None]
+
+    def __getitem__(self, field: str) -> np.ndarray:
+        return self.arrays[field]
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, ts_codes: List[str], window: int = 20) -> 'HistoryMatrix':
+        """
+        由长表（每行一只股票一个交易日）构建矩阵
+
+        Args:
+            df: 历史数据，至少包含 ts_code、trade_date 和 FIELDS 中的字段
+            ts_codes: 矩阵行顺序对应的股票代码
+            window: 窗口天数
+
+        Returns:
+            HistoryMatrix
+        """
+        n = len(ts_codes)
+        arrays = {field: np.full((n, window), np.nan) for field in cls.FIELDS}
+        lengths = np.zeros(n, dtype=np.int64)
+
+        if df is None or df.empty or n == 0:
+            return cls(ts_codes, window, arrays, lengths)
+
+        df = df.sort_values(['ts_code', 'trade_date'], kind='mergesort')
+        rows = pd.Index(ts_codes).get_indexer(df['ts_code'])
+        # 距最新交易日的偏移（0 表示最新一天）
+        offset = df.groupby('ts_code', sort=False).cumcount(ascending=False).to_numpy()
+
+        keep = (rows >= 0) & (offset < window)
+        rows = rows[keep]
+        cols = window - 1 - offset[keep]
+
+        for field in cls.FIELDS:
+            values = pd.to_numeric(df[field], errors='coerce').to_numpy(dtype=float)
+            arrays[field][rows, cols] = values[keep]
+
+        np.add.at(lengths, rows, 1)
+        return cls(ts_codes, window, arrays, lengths)
+
+    @classmethod
+    def from_records(cls, stock_history: Dict[str, List[Dict]], ts_codes: List[str], window: int = 20) -> 'HistoryMatrix':
+        """
+        由 {股票代码: 历史数据列表} 字典构建矩阵（兼容 get_historical_data 的返回格式）
+        """
+        records = [record for ts_code in ts_codes for record in stock_history.get(ts_code, [])]
+        if not records:
+            return cls.from_frame(None, ts_codes, window)
+        df = pd.DataFrame.from_records(records)
+        for field in cls.FIELDS:
+            if field not in df.columns:
+                df[field] = 0
+        return cls.from_frame(df, ts_codes, window)
+
+
+class B1TagEngine:
+    """
+    B1加分项/减分项列式计算引擎
+
+    对全部候选股票一次性计算每个标签，返回按 stock_df 行顺序排列的布尔数组。
+    判定规则与原逐只计算的 calc_* 版本保持一致（对照实现见 test/test_b1_tag_engine.py）。
+    """
+
+    def __init__(self, stock_df: pd.DataFrame, history: HistoryMatrix, ma_lookup: Optional[pd.DataFrame] = None):
+        """
+        Args:
+            stock_df: 当日股票数据（verify_filter_tags 的输出）
+            history: 与 stock_df 行顺序一致的历史行情矩阵
+            ma_lookup: 以 ts_code 为索引的均线数据（可选）
+        """
+        self.stock_df = stock_df
+        self.history = history
+        self.ma_lookup = ma_lookup
+        self.n = len(stock_df)
+
+        self._handlers = {
+            'up1': self.tag_up1_red_fat_green_thin,
+            'up2': self.tag_up2_shrink_after_divergence,
+            'up3': self.tag_up3_small_candle,
+            'up4': self.tag_up4_recent_abnormal,
+            'up5': self.tag_up5_double_volume_red,
+            'up6': self.tag_up6_swing_appropriate,
+            'up7': self.tag_up7_market_cap_appropriate,
+            'high_vol': self.tag_high_vol,
+            'break_ma': self.tag_break_ma,
+            'down1': self.tag_minus_down1,
+            'down2': self.tag_minus_down2,
+        }
+
+    def evaluate(self, tag_code: str) -> np.ndarray:
+        """
+        计算单个标签
+
+        Args:
+            tag_code: 标签代码
+
+        Returns:
+            布尔数组，未知标签返回全False
+        """
+        handler = self._handlers.get(tag_code)
+        if handler is None:
+            return np.zeros(self.n, dtype=bool)
+        return np.asarray(handler(), dtype=bool)
+
+    def _column(self, name: str) -> np.ndarray:
+        return pd.to_numeric(self.stock_df[name], errors='coerce').to_numpy(dtype=float)
+
+    def _recent(self, days: int) -> np.ndarray:
+        """最近 days 个交易日（不足则取全部历史）的有效位置"""
+        h = self.history
+        return h.valid & (h.columns[None, :] >= h.window - days)
+
+    @staticmethod
+    def _prev(arr: np.ndarray, lag: int = 1) -> np.ndarray:
+        """按列右移 lag 位，空出的位置为NaN"""
+        shifted = np.full_like(arr, np.nan)
+        shifted[:, lag:] = arr[:, :-lag]
+        return shifted
+
+    def tag_minus_down1(self) -> np.ndarray:
+        """减分项1：最近10个交易日出现过（下跌且成交量>=前5日最大成交量）"""
+        h = self.history
+        # 成交量按整数比较（与逐只版本的 int() 截断一致）
+        pct, vol = h['pct_change'], np.trunc(h['vol'])
+
+        # 前5日成交量最大值（第 j 列取 j-5..j-1 列）
+        pre_5_max = np.full_like(vol, np.nan)
+        if h.window > 5:
+            windows = np.lib.stride_tricks.sliding_window_view(vol, 5, axis=1)
+            pre_5_max[:, 5:] = windows[:, :-1].max(axis=2)
+
+        candidate = self._recent(10) & (h.columns[None, :] >= h.start[:, None] + 5)
+        hit = candidate & ~(pct >= 0) & (vol >= pre_5_max)
+        return (h.lengths >= 10) & hit.any(axis=1)
+
+    def tag_minus_down2(self) -> np.ndarray:
+        """减分项2：最近20个交易日出现过涨停且涨停日成交量<=前一日成交量*50%"""
+        h = self.history
+        pct, vol = h['pct_change'], np.trunc(h['vol'])
+        candidate = h.valid & (h.columns[None, :] >= h.start[:, None] + 1)
+        hit = candidate & ~(pct < 9.8) & (vol <= self._prev(vol) * 0.5)
+        return (h.lengths >= 2) & hit.any(axis=1)
+
+    def tag_up1_red_fat_green_thin(self) -> np.ndarray:
+        """加分项1：红肥绿瘦（最近10个交易日，所有上涨日交易量都大于相邻下跌日）"""
+        h = self.history
+        pct, vol = h['pct_change'], h['vol']
+        recent = self._recent(10)
+        up = recent & (pct > 0)
+        down = recent & ~(pct > 0)
+
+        cols = np.broadcast_to(h.columns, vol.shape)
+        rows = np.arange(vol.shape[0])[:, None]
+
+        # 之前最近一个下跌日的列号（不含自身）
+        last_down = np.maximum.accumulate(np.where(down, cols, -1), axis=1)
+        prev_down = np.full_like(last_down, -1)
+        prev_down[:, 1:] = last_down[:, :-1]
+
+        # 之后最近一个下跌日的列号（不含自身）
+        next_down_incl = np.minimum.accumulate(np.where(down, cols, h.window)[:, ::-1], axis=1)[:, ::-1]
+        next_down = np.full_like(next_down_incl, h.window)
+        next_down[:, :-1] = next_down_incl[:, 1:]
+
+        prev_vol = vol[rows, np.clip(prev_down, 0, h.window - 1)]
+        next_vol = vol[rows, np.clip(next_down, 0, h.window - 1)]
+
+        violation = up & (
+            ((prev_down >= 0) & (vol <= prev_vol)) |
+            ((next_down < h.window) & (vol <= next_vol))
+        )
+        return (h.lengths >= 2) & ~violation.any(axis=1)
+
+    def tag_up2_shrink_after_divergence(self) -> np.ndarray:
+        """加分项2：分歧之后突然缩量（当日成交额 <= 前一日成交额 * 50%）"""
+        h = self.history
+        today_amt = h['amount'][:, -1]
+        prev_amt = h['amount'][:, -2] if h.window >= 2 else np.full(len(h.lengths), np.nan)
+        return (h.lengths >= 2) & (prev_amt > 0) & (today_amt <= prev_amt * 0.5)
+
+    def tag_up3_small_candle(self) -> np.ndarray:
+        """加分项3：小阴小阳（当天涨跌幅在 -2% 到 1.8% 之间）"""
+        pct = self._column('pct_change')
+        return (pct >= -2) & (pct <= 1.8)
+
+    def tag_up4_recent_abnormal(self) -> np.ndarray:
+        """加分项4：近期有异动（最近10个交易日中存在涨幅≥6% 且 成交量≥前一日×1.5）"""
+        h = self.history
+        pct, vol = h['pct_change'], h['vol']
+        prev_vol = self._prev(vol)
+        candidate = self._recent(10) & self._prev_in_window(10)
+        hit = candidate & (pct >= 6.0) & (prev_vol > 0) & (vol >= prev_vol * 1.5)
+        return (h.lengths >= 2) & hit.any(axis=1)
+
+    def tag_up5_double_volume_red(self) -> np.ndarray:
+        """加分项5：近期有倍量红柱出现（最近10日存在上涨日且成交量≥前一日×1.8）"""
+        h = self.history
+        pct, vol = h['pct_change'], h['vol']
+        prev_vol = self._prev(vol)
+        candidate = self._recent(10) & self._prev_in_window(10)
+        hit = candidate & ~(pct <= 0) & (prev_vol > 0) & (vol >= prev_vol * 1.8)
+        return (h.lengths >= 2) & hit.any(axis=1)
+
+    def _prev_in_window(self, days: int) -> np.ndarray:
+        """前一日同样落在最近 days 个交易日窗口内的位置"""
+        h = self.history
+        first = np.maximum(h.start, h.window - days)
+        return h.columns[None, :] >= first[:, None] + 1
+
+    def tag_up6_swing_appropriate(self) -> np.ndarray:
+        """加分项6：振幅适当（600开头≤4%，000/300/688开头≤7%）"""
+        swing = self._column('swing')
+        ts_code = self.stock_df['ts_code'].astype(str)
+        is_sh = ts_code.str.startswith('600').to_numpy()
+        is_other = ts_code.str.startswith(('000', '300', '688')).to_numpy()
+        return (is_sh & (swing <= 4.0)) | (~is_sh & is_other & (swing <= 7.0))
+
+    def tag_up7_market_cap_appropriate(self) -> np.ndarray:
+        """加分项7：市值适当（总市值≥80亿，数据库单位是万元）"""
+        return self._column('total_mv') >= 800000
+
+    def tag_high_vol(self) -> np.ndarray:
+        """减分项：高位放量有风险"""
+        h = self.history
+        amounts = np.where(self._recent(10), h['amount'], -np.inf)
+        max_amount = amounts.max(axis=1)
+        # 窗口内存在NaN时不判定
+        has_nan = (self._recent(10) & np.isnan(h['amount'])).any(axis=1)
+        current_amount = self._column('amount')
+        return (h.lengths >= 10) & ~has_nan & (current_amount >= max_amount * 0.8)
+
+    def tag_break_ma(self) -> np.ndarray:
+        """减分项：跌破MA20（均线数据来自 B1SignalService.get_ma_lookup 的批量预取）"""
+        if self.ma_lookup is None or self.ma_lookup.empty:
+            return np.zeros(self.n, dtype=bool)
+        ma20 = pd.to_numeric(
+            self.ma_lookup['ma20'].reindex(self.stock_df['ts_code']), errors='coerce'
+        ).to_numpy(dtype=float)
+        return self._column('close_price') < ma20
@@ -0,0 +1,179 @@
+"""
+市场概览快照
+每日定时任务在数据落库、B1信号计算完成后计算一次当日市场统计并写入 market_daily_snapshot，
+/market/overview 接口按主键读取最新一行；快照缺失时接口用同一条统计SQL现场计算。
+"""
+
+from typing import Any, Dict, Optional
+from core.database import get_sync_connection
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__, 'market_snapshot.log')
+
+SNAPSHOT_COLUMNS = [
+    'trade_date', 'total_stocks', 'total_amount', 'avg_pct_change', 'up_stocks', 'down_stocks',
+    'b1_count', 's1_count', 'monitor_pool_count',
+    'prev_trade_date', 'prev_win_count', 'prev_total_count'
+]
+
+# 单个交易日的市场统计（一条语句，所有子查询均走 trade_date 索引）
+MARKET_STATS_SQL = """
+SELECT
+    %(trade_date)s AS trade_date,
+    d.total_stocks, d.total_amount, d.avg_pct_change, d.up_stocks, d.down_stocks,
+    (SELECT COUNT(*) FROM b1_signal_results WHERE trade_date = %(trade_date)s) AS b1_count,
+    (SELECT COUNT(*) FROM s1_signal_results WHERE trade_date = %(trade_date)s) AS s1_count,
+    (SELECT COUNT(*) FROM stock_list WHERE is_active = 1) AS monitor_pool_count,
+    p.prev_trade_date, p.prev_win_count, p.prev_total_count
+FROM (
+    SELECT
+        COUNT(*) AS total_stocks,
+        SUM(amount) AS total_amount,
+        AVG(pct_change) AS avg_pct_change,
+        SUM(CASE WHEN pct_change > 0 THEN 1 ELSE 0 END) AS up_stocks,
+        SUM(CASE WHEN pct_change < 0 THEN 1 ELSE 0 END) AS down_stocks
+    FROM bak_daily_data
+    WHERE trade_date = %(trade_date)s
+) d
+CROSS JOIN (
+    SELECT
+        y.prev_trade_date,
+        COALESCE(SUM(CASE WHEN b.pct_change > 1 THEN 1 ELSE 0 END), 0) AS prev_win_count,
+        COUNT(b.id) AS prev_total_count
+    FROM (
+        SELECT MAX(trade_date) AS prev_trade_date FROM bak_daily_data WHERE trade_date < %(trade_date)s
+    ) y
+    LEFT JOIN bak_daily_data b ON b.trade_date = y.prev_trade_date
+    GROUP BY y.prev_trade_date
+) p
+"""
+
+LATEST_TRADE_DATE_SQL = "SELECT MAX(trade_date) FROM bak_daily_data"
+
+LATEST_SNAPSHOT_SQL = (
+    f"SELECT {', '.join(SNAPSHOT_COLUMNS)} FROM market_daily_snapshot ORDER BY trade_date DESC LIMIT 1"
+)
+
+UPSERT_SNAPSHOT_SQL = (
+    f"INSERT INTO market_daily_snapshot ({', '.join(SNAPSHOT_COLUMNS)}) "
+    f"VALUES ({', '.join(['%s'] * len(SNAPSHOT_COLUMNS))}) "
+    f"ON DUPLICATE KEY UPDATE "
+    + ', '.join(f"{col}=VALUES({col})" for col in SNAPSHOT_COLUMNS[1:])
+)
+
+EMPTY_OVERVIEW = {
+    "activeMarketCap": "0",
+    "marketSentiment": "无数据",
+    "sentimentChange": 0,
+    "todayB1Count": 0,
+    "monitorPoolCount": 0,
+    "b1Condition": "J值<13 & MACD>0",
+    "b1Triggered": 0,
+    "b1Total": 0,
+    "s1Triggered": 0,
+    "s1Total": 0,
+    "sellWarningCount": 0,
+    "sellCondition": "跌破白线/长放飞",
+    "yesterdayWinRate": 0,
+    "winRateCondition": "次日涨幅 > 1%"
+}
+
+
+def refresh_market_snapshot(trade_date: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    计算并写入单个交易日的市场概览快照
+
+    Args:
+        trade_date: 交易日期(YYYYMMDD)，默认 bak_daily_data 中的最新交易日
+
+    Returns:
+        快照数据；没有行情数据时返回None
+    """
+    conn = get_sync_connection()
+    try:
+        with conn.cursor() as cursor:
+            if trade_date is None:
+                cursor.execute(LATEST_TRADE_DATE_SQL)
+                row = cursor.fetchone()
+                trade_date = row[0] if row else None
+                if not trade_date:
+                    logger.warning("bak_daily_data 无数据，跳过市场概览快照")
+                    return None
+
+            cursor.execute(MARKET_STATS_SQL, {'trade_date': trade_date})
+            snapshot = dict(zip(SNAPSHOT_COLUMNS, cursor.fetchone()))
+            if not snapshot['total_stocks']:
+                logger.warning(f"{trade_date} 无行情数据，跳过市场概览快照")
+                return None
+
+            cursor.execute(UPSERT_SNAPSHOT_SQL, [snapshot[col] for col in SNAPSHOT_COLUMNS])
+        conn.commit()
+        logger.info(f"市场概览快照已刷新: {snapshot}")
+        return snapshot
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def build_market_overview(snapshot: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    由快照（或现场统计）生成 /market/overview 的返回数据
+
+    Args:
+        snapshot: SNAPSHOT_COLUMNS 对应的字典，None表示没有数据
+
+    Returns:
+        市场概览数据
+    """
+    if not snapshot or not snapshot['total_stocks']:
+        return dict(EMPTY_OVERVIEW)
+
+    total_stocks = snapshot['total_stocks']
+    total_amount = snapshot['total_amount']
+    avg_pct_change = snapshot['avg_pct_change']
+
+    # 活跃市值（单位：万亿）
+    if total_amount:
+        active_market_cap = float(total_amount) / 1000000000000  # 转换为万亿
+        active_market_cap_str = f"{active_market_cap:.2f}万亿"
+    else:
+        active_market_cap_str = "0"
+
+    # 市场情绪（基于涨跌股票比例）
+    up_ratio = (snapshot['up_stocks'] or 0) / total_stocks
+    if up_ratio > 0.6:
+        market_sentiment = "乐观"
+    elif up_ratio > 0.4:
+        market_sentiment = "中性"
+    else:
+        market_sentiment = "悲观"
+
+    # 情绪变化（基于平均涨跌幅）
+    sentiment_change = round(float(avg_pct_change), 2) if avg_pct_change else 0
+
+    # 昨日胜率
+    prev_total = snapshot['prev_total_count'] or 0
+    if prev_total > 0:
+        yesterday_win_rate = round((int(snapshot['prev_win_count'] or 0) / prev_total) * 100, 1)
+    else:
+        yesterday_win_rate = 0
+
+    b1_count = int(snapshot['b1_count'] or 0)
+    s1_count = int(snapshot['s1_count'] or 0)
+
+    return {
+        **EMPTY_OVERVIEW,
+        "activeMarketCap": active_market_cap_str,
+        "marketSentiment": market_sentiment,
+        "sentimentChange": sentiment_change,
+        "todayB1Count": b1_count,
+        "monitorPoolCount": int(snapshot['monitor_pool_count'] or 0),
+        "b1Triggered": b1_count,
+        "b1Total": b1_count,
+        "s1Triggered": s1_count,
+        "s1Total": s1_count,
+        "sellWarningCount": s1_count,
+        "yesterdayWinRate": yesterday_win_rate,
+    }
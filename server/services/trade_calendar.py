@@ -0,0 +1,168 @@
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__, 'trade_calendar.log')
+
+
+class TradeCalendar:
+    """
+    交易日历（进程级缓存）
+
+    日历数据持久化在 trade_calendar 表中，由数据落库任务从Tushare同步。
+    首次使用时整表加载到内存，之后所有查询均为O(1)的下标运算，不再访问数据库或Tushare。
+    """
+
+    EXCHANGE = 'SSE'
+
+    # (交易日列表, {日历日: 不晚于该日的最后一个交易日下标}, 首个日历日, 最后一个日历日)
+    _state: Optional[Tuple[List[str], Dict[str, int], str, str]] = None
+    _lock = threading.Lock()
+
+    # 日历未覆盖所需日期（如新年度尚未同步）或加载失败时，距上次从数据库加载不足该秒数则不重新加载
+    RELOAD_INTERVAL = 300
+    _last_load: Optional[float] = None
+
+    @classmethod
+    def load_rows(cls, rows: Iterable[Tuple[str, int]]):
+        """
+        用 (cal_date, is_open) 记录替换内存中的日历
+
+        Args:
+            rows: 日历记录，cal_date为YYYYMMDD字符串
+        """
+        rows = sorted((str(cal_date), int(is_open)) for cal_date, is_open in rows)
+        if not rows:
+            return
+
+        open_dates = []
+        floor_index = {}
+        for cal_date, is_open in rows:
+            if is_open:
+                open_dates.append(cal_date)
+            floor_index[cal_date] = len(open_dates) - 1
+
+        with cls._lock:
+            cls._state = (open_dates, floor_index, rows[0][0], rows[-1][0])
+        logger.info(f"交易日历已加载：{rows[0][0]} 至 {rows[-1][0]}，共 {len(open_dates)} 个交易日")
+
+    @classmethod
+    def load_from_db(cls, conn) -> bool:
+        """
+        从 trade_calendar 表加载日历
+
+        Args:
+            conn: DB-API连接（pymysql连接或SQLAlchemy raw_connection）
+
+        Returns:
+            是否加载到数据
+        """
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                "SELECT cal_date, is_open FROM trade_calendar WHERE exchange = %s",
+                [cls.EXCHANGE]
+            )
+            rows = [(row[0], row[1]) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+        cls.load_rows(rows)
+        return bool(rows)
+
+    @classmethod
+    def ensure_loaded(cls, conn, end_date: str = None) -> bool:
+        """
+        确保日历已加载且覆盖 end_date，未加载时从数据库加载一次
+
+        加载后仍不覆盖或加载失败时，RELOAD_INTERVAL 秒内直接返回False，
+        避免逐请求、逐日期的循环中反复整表加载。
+
+        Returns:
+            日历是否可用
+        """
+        if cls.covers(end_date):
+            return True
+        now = time.monotonic()
+        with cls._lock:
+            if cls._last_load is not None and now - cls._last_load < cls.RELOAD_INTERVAL:
+                return False
+            cls._last_load = now
+        try:
+            cls.load_from_db(conn)
+        except Exception as e:
+            logger.warning(f"加载交易日历失败: {e}")
+            return False
+        return cls.covers(end_date)
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._state = None
+            cls._last_load = None
+
+    @classmethod
+    def covers(cls, date: str = None) -> bool:
+        state = cls._state
+        if state is None:
+            return False
+        if date is None:
+            return True
+        return state[2] <= date <= state[3]
+
+    @classmethod
+    def _floor(cls, date: str) -> Tuple[List[str], int]:
+        state = cls._state
+        if state is None or not (state[2] <= date <= state[3]):
+            raise KeyError(f"交易日历未覆盖日期 {date}")
+        return state[0], state[1][date]
+
+    @classmethod
+    def is_trading_day(cls, date: str) -> bool:
+        open_dates, idx = cls._floor(date)
+        return idx >= 0 and open_dates[idx] == date
+
+    @classmethod
+    def latest_trading_day(cls, date: str) -> Optional[str]:
+        """不晚于 date 的最后一个交易日"""
+        open_dates, idx = cls._floor(date)
+        return open_dates[idx] if idx >= 0 else None
+
+    @classmethod
+    def prev_trading_day(cls, date: str, n: int = 1) -> Optional[str]:
+        """
+        不晚于 date 的最后一个交易日之前第 n 个交易日（n=0 即该交易日本身）
+
+        Args:
+            date: 日期(YYYYMMDD)
+            n: 向前的交易日数
+
+        Returns:
+            交易日期，超出日历范围时返回None
+        """
+        open_dates, idx = cls._floor(date)
+        target = idx - n
+        return open_dates[target] if 0 <= target < len(open_dates) else None
+
+    @classmethod
+    def trading_days_between(cls, start_date: str, end_date: str) -> int:
+        """[start_date, end_date] 区间内的交易日数量"""
+        open_dates, end_idx = cls._floor(end_date)
+        _, start_idx = cls._floor(start_date)
+        if start_idx >= 0 and open_dates[start_idx] == start_date:
+            start_idx -= 1
+        return max(end_idx - start_idx, 0)
+
+    @classmethod
+    def recent_trading_days(cls, end_date: str, n: int) -> List[str]:
+        """截至 end_date（含）最近 n 个交易日，按日期升序"""
+        open_dates, idx = cls._floor(end_date)
+        return open_dates[max(idx - n + 1, 0):idx + 1]
+
+    @classmethod
+    def trading_dates_between(cls, start_date: str, end_date: str) -> List[str]:
+        """[start_date, end_date] 区间内的交易日，按日期升序"""
+        open_dates, end_idx = cls._floor(end_date)
+        count = cls.trading_days_between(start_date, end_date)
+        return open_dates[end_idx - count + 1:end_idx + 1] if count else []
@@ -3,6 +3,7 @@ import string
 import httpx
 from datetime import datetime, timedelta
 from typing import Optional, List
+from core.cache import user_principal_cache
 from core.config import settings
 from core.security import create_access_token, verify_token
 from services.smsService import send_sms
@@ -80,8 +81,7 @@ class UserService:
 
             await cursor.execute("SELECT * FROM users WHERE id = %s", (user_id,))
             row = await cursor.fetchone()
-            await cursor.execute("DESC users")
-            columns = [col[0] for col in await cursor.fetchall()]
+            columns = [col[0] for col in cursor.description]
             user = dict(zip(columns, row))
 
         await self._copy_admin_tags(user_id)
@@ -115,8 +115,7 @@ class UserService:
             row = await cursor.fetchone()
 
             if row:
-                await cursor.execute("DESC users")
-                columns = [col[0] for col in await cursor.fetchall()]
+                columns = [col[0] for col in cursor.description]
                 user = dict(zip(columns, row))
                 token = create_access_token({"sub": str(user['id']), "role": user['role']})
                 return {"user": user, "token": token}
@@ -180,8 +179,7 @@ class UserService:
                 await cursor.execute("SELECT * FROM users WHERE id = %s", (user_id,))
                 row = await cursor.fetchone()
 
-            await cursor.execute("DESC users")
-            columns = [col[0] for col in await cursor.fetchall()]
+            columns = [col[0] for col in cursor.description]
             user = dict(zip(columns, row))
             token = create_access_token({"sub": str(user['id']), "role": user['role']})
             return {"user": user, "token": token}
@@ -191,8 +189,7 @@ class UserService:
             query = "SELECT * FROM users ORDER BY created_at DESC LIMIT %s OFFSET %s"
             await cursor.execute(query, (limit, skip))
             rows = await cursor.fetchall()
-            await cursor.execute("DESC users")
-            columns = [col[0] for col in await cursor.fetchall()]
+            columns = [col[0] for col in cursor.description]
             return [dict(zip(columns, row)) for row in rows]
 
     async def get_user_by_id(self, user_id: int) -> Optional[dict]:
@@ -201,8 +198,7 @@ class UserService:
             await cursor.execute(query, (user_id,))
             row = await cursor.fetchone()
             if row:
-                await cursor.execute("DESC users")
-                columns = [col[0] for col in await cursor.fetchall()]
+                columns = [col[0] for col in cursor.description]
                 return dict(zip(columns, row))
         return None
 
@@ -223,12 +219,12 @@ class UserService:
             query = f"UPDATE users SET {', '.join(fields)} WHERE id = %s"
             await cursor.execute(query, tuple(values))
             await self.db.commit()
+            user_principal_cache.invalidate(str(user_id))
 
             if cursor.rowcount > 0:
                 await cursor.execute("SELECT * FROM users WHERE id = %s", (user_id,))
                 row = await cursor.fetchone()
-                await cursor.execute("DESC users")
-                columns = [col[0] for col in await cursor.fetchall()]
+                columns = [col[0] for col in cursor.description]
                 return dict(zip(columns, row))
         return None
 
@@ -237,4 +233,5 @@ class UserService:
             query = "DELETE FROM users WHERE id = %s"
             await cursor.execute(query, (user_id,))
             await self.db.commit()
+            user_principal_cache.invalidate(str(user_id))
             return cursor.rowcount > 0
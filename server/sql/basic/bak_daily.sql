@@ -53,6 +53,8 @@ CREATE TABLE IF NOT EXISTS bak_daily_data (
     interval_3 DECIMAL(10, 4) COMMENT '近3月涨幅(%)',
     interval_6 DECIMAL(10, 4) COMMENT '近6月涨幅(%)',
     
+    row_hash BIGINT UNSIGNED COMMENT '行内容哈希(落库时比对，未变化的行不重写)',
+    
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
     
@@ -63,3 +65,8 @@ CREATE TABLE IF NOT EXISTS bak_daily_data (
     KEY idx_pct_change (pct_change),
     KEY idx_vol_ratio (vol_ratio)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='备用行情基础数据表';
+
+-- ==========================================
+-- 已存在表的升级脚本（仅执行一次）
+-- ==========================================
+-- ALTER TABLE bak_daily_data ADD COLUMN row_hash BIGINT UNSIGNED COMMENT '行内容哈希(落库时比对，未变化的行不重写)' AFTER interval_6;
@@ -348,6 +348,8 @@ CREATE TABLE IF NOT EXISTS stk_factor_pro_data (
     xsii_td4_hfq DECIMAL(15, 4) COMMENT 'XSII-TD4(后复权)',
     xsii_td4_qfq DECIMAL(15, 4) COMMENT 'XSII-TD4(前复权)',
     
+    row_hash BIGINT UNSIGNED COMMENT '行内容哈希(落库时比对，未变化的行不重写)',
+    
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
     
@@ -359,3 +361,8 @@ CREATE TABLE IF NOT EXISTS stk_factor_pro_data (
     KEY idx_kdj_qfq (kdj_qfq),
     KEY idx_macd_dif_qfq (macd_dif_qfq)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='股票技术面因子基础数据表';
+
+-- ==========================================
+-- 已存在表的升级脚本（仅执行一次）
+-- ==========================================
+-- ALTER TABLE stk_factor_pro_data ADD COLUMN row_hash BIGINT UNSIGNED COMMENT '行内容哈希(落库时比对，未变化的行不重写)' AFTER xsii_td4_qfq;
@@ -0,0 +1,19 @@
+-- ==========================================
+-- 交易日历表
+-- 数据来源：Tushare trade_cal接口（上交所SSE）
+-- 用途：本地缓存交易日历，供数据落库和B1信号计算查询交易日
+-- ==========================================
+
+USE ttssreport;
+
+CREATE TABLE IF NOT EXISTS trade_calendar (
+    cal_date VARCHAR(8) NOT NULL COMMENT '日历日期(YYYYMMDD)',
+    exchange VARCHAR(10) NOT NULL DEFAULT 'SSE' COMMENT '交易所',
+    is_open TINYINT NOT NULL COMMENT '是否交易(1=是,0=否)',
+    pretrade_date VARCHAR(8) COMMENT '上一个交易日',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
+
+    PRIMARY KEY (exchange, cal_date),
+    KEY idx_is_open (is_open)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='交易日历表';
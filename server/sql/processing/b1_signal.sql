@@ -55,7 +55,7 @@ CREATE TABLE IF NOT EXISTS b1_signal_results (
     -- 匹配标签
     matched_tag_ids JSON COMMENT '匹配的标签ID列表',
     matched_tag_names JSON COMMENT '匹配的标签名称列表',
-    matched_tag_codes JSON COMMENT '匹配的标签code列表'
+    matched_tag_codes JSON COMMENT '匹配的标签code列表',
     plus_tags_count INT DEFAULT 0 COMMENT '加分项数量',
     minus_tags_count INT DEFAULT 0 COMMENT '减分项数量',
     tag_score INT DEFAULT 0 COMMENT '标签得分(加分项-减分项)',
@@ -65,6 +65,7 @@ CREATE TABLE IF NOT EXISTS b1_signal_results (
     
     UNIQUE KEY uk_ts_code_trade_date (ts_code, trade_date),
     KEY idx_trade_date (trade_date),
+    KEY idx_trade_date_score (trade_date, tag_score, volume_ratio),
     KEY idx_signal_strength (signal_strength),
     KEY idx_tag_score (tag_score DESC),
     KEY idx_industry (industry),
@@ -0,0 +1,19 @@
+-- ==========================================
+-- B1信号标签索引表
+-- 数据来源：B1SignalService.save_results 与 b1_signal_results 同事务写入
+-- 用途：按标签查询/排除信号时走索引，避免解析 matched_tag_codes JSON 列
+-- 重建：B1SignalService.rebuild_tag_index（scheduler.b1_signal_job.rebuild_b1_tag_index）
+-- ==========================================
+
+USE ttssreport;
+
+CREATE TABLE IF NOT EXISTS b1_signal_tag_index (
+    trade_date DATE NOT NULL COMMENT '交易日期',
+    ts_code VARCHAR(20) NOT NULL COMMENT 'TS股票代码',
+    tag_id INT NOT NULL COMMENT '标签ID(strategy_config_tags.id)',
+    tag_code VARCHAR(50) NOT NULL COMMENT '标签代码',
+
+    PRIMARY KEY (trade_date, ts_code, tag_id),
+    KEY idx_date_code (trade_date, tag_code, ts_code),
+    KEY idx_tag_id (tag_id, trade_date)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='B1信号标签索引表';
@@ -13,10 +13,14 @@ CREATE TABLE IF NOT EXISTS data_integration_log (
     total_records INT COMMENT '总记录数',
     inserted_records INT COMMENT '插入记录数',
     updated_records INT COMMENT '更新记录数',
+    skipped_records INT DEFAULT 0 COMMENT '内容未变化跳过写入的记录数',
     error_message LONGTEXT COMMENT '错误信息',
     start_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '开始时间',
     end_time TIMESTAMP NULL DEFAULT NULL COMMENT '结束时间',
     duration_seconds INT COMMENT '耗时(秒)',
+    fetch_seconds DECIMAL(10, 3) COMMENT '获取阶段耗时(秒)',
+    convert_seconds DECIMAL(10, 3) COMMENT '类型转换阶段耗时(秒)',
+    save_seconds DECIMAL(10, 3) COMMENT '落库阶段耗时(秒)',
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
     
     KEY idx_trade_date (trade_date),
@@ -24,3 +28,11 @@ CREATE TABLE IF NOT EXISTS data_integration_log (
     KEY idx_status (status),
     KEY idx_created_at (created_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='数据集成日志表';
+
+-- ==========================================
+-- 已存在表的升级脚本（仅执行一次）
+-- ==========================================
+-- ALTER TABLE data_integration_log ADD COLUMN fetch_seconds DECIMAL(10, 3) COMMENT '获取阶段耗时(秒)' AFTER duration_seconds;
+-- ALTER TABLE data_integration_log ADD COLUMN convert_seconds DECIMAL(10, 3) COMMENT '类型转换阶段耗时(秒)' AFTER fetch_seconds;
+-- ALTER TABLE data_integration_log ADD COLUMN save_seconds DECIMAL(10, 3) COMMENT '落库阶段耗时(秒)' AFTER convert_seconds;
+-- ALTER TABLE data_integration_log ADD COLUMN skipped_records INT DEFAULT 0 COMMENT '内容未变化跳过写入的记录数' AFTER updated_records;
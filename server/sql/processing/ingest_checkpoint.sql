@@ -0,0 +1,22 @@
+-- ==========================================
+-- 数据落库断点表
+-- 用途：记录历史回补中每个(数据集, 交易日)的完成情况，中断后重跑时跳过已完成的交易日
+-- 写入：scheduler.backfill_job（scripts/backfill.py）在每个交易日落库提交后写入
+-- ==========================================
+
+USE ttssreport;
+
+CREATE TABLE IF NOT EXISTS ingest_checkpoint (
+    dataset VARCHAR(50) NOT NULL COMMENT '数据集(bak_daily/stk_factor_pro)',
+    trade_date VARCHAR(8) NOT NULL COMMENT '交易日期(YYYYMMDD)',
+    status VARCHAR(20) NOT NULL COMMENT '状态(done/failed/skipped：接口无数据，重跑时重试)',
+    records INT DEFAULT 0 COMMENT '落库记录数',
+    error_message TEXT COMMENT '错误信息',
+    fetch_seconds DECIMAL(10, 3) COMMENT '获取阶段耗时(秒)',
+    convert_seconds DECIMAL(10, 3) COMMENT '类型转换阶段耗时(秒)',
+    save_seconds DECIMAL(10, 3) COMMENT '落库阶段耗时(秒)',
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
+
+    PRIMARY KEY (dataset, trade_date),
+    KEY idx_status (status)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='数据落库断点表';
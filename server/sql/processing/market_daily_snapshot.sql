@@ -0,0 +1,34 @@
+-- ==========================================
+-- 市场概览每日快照表
+-- 用途：/market/overview 接口按主键读取最新一行，替代每次请求时的多条聚合查询
+-- 写入：每日定时任务在数据落库和B1信号计算完成后刷新（services.market_snapshot_service）
+-- ==========================================
+
+USE ttssreport;
+
+CREATE TABLE IF NOT EXISTS market_daily_snapshot (
+    trade_date VARCHAR(8) NOT NULL COMMENT '交易日期(YYYYMMDD)',
+
+    -- 当日行情统计（bak_daily_data）
+    total_stocks INT DEFAULT 0 COMMENT '股票数量',
+    total_amount DECIMAL(24, 2) COMMENT '成交额合计(千元)',
+    avg_pct_change DECIMAL(10, 4) COMMENT '平均涨跌幅(%)',
+    up_stocks INT DEFAULT 0 COMMENT '上涨家数',
+    down_stocks INT DEFAULT 0 COMMENT '下跌家数',
+
+    -- 信号统计（b1_signal_results / s1_signal_results）
+    b1_count INT DEFAULT 0 COMMENT 'B1信号数量',
+    s1_count INT DEFAULT 0 COMMENT 'S1信号数量',
+
+    -- 监控池（stock_list）
+    monitor_pool_count INT DEFAULT 0 COMMENT '监控池股票数量',
+
+    -- 上一交易日胜率
+    prev_trade_date VARCHAR(8) COMMENT '上一交易日',
+    prev_win_count INT DEFAULT 0 COMMENT '上一交易日涨幅>1%的股票数量',
+    prev_total_count INT DEFAULT 0 COMMENT '上一交易日股票数量',
+
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '刷新时间',
+
+    PRIMARY KEY (trade_date)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='市场概览每日快照表';
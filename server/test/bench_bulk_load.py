@@ -0,0 +1,75 @@
+"""
+批量写入基准：多行 INSERT ... ON DUPLICATE KEY UPDATE 与 LOAD DATA LOCAL INFILE 对比
+
+在 settings 配置的数据库中创建临时基准表（结构仿照 stk_factor_pro_data：代码/日期 + N 个DECIMAL列），
+分别测量首次导入和全量upsert两种场景，结束后删除基准表。需要MySQL开启 local_infile。
+
+用法（在server目录下）：PYTHONPATH=. python test/bench_bulk_load.py --rows 5000 --cols 250
+"""
+import argparse
+import time
+import numpy as np
+import pymysql
+from core.config import settings
+from utils.bulk_writer import BulkWriter
+
+TABLE = 'bench_bulk_load'
+
+
+def make_rows(rows: int, cols: int, seed: int):
+    rng = np.random.default_rng(seed)
+    values = np.round(rng.normal(size=(rows, cols)) * 100, 4).astype(object)
+    values[rng.random((rows, cols)) < 0.05] = None
+    return [(f"{i:06d}.SZ", '20240102') + tuple(row) for i, row in enumerate(values.tolist())]
+
+
+def timed(conn, func, *args):
+    cursor = conn.cursor()
+    start = time.perf_counter()
+    try:
+        affected = func(cursor, *args)
+        conn.commit()
+    finally:
+        cursor.close()
+    return time.perf_counter() - start, affected
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--cols', type=int, default=250)
+    args = parser.parse_args()
+
+    factor_columns = [f"f{i}" for i in range(args.cols)]
+    columns = ['ts_code', 'trade_date'] + factor_columns
+    writer = BulkWriter(TABLE, columns, update_columns=factor_columns, batch_size=500)
+
+    conn = pymysql.connect(local_infile=True, charset=settings.DB_CHARSET, **settings.db_config)
+    cursor = conn.cursor()
+    cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+    cursor.execute(
+        f"CREATE TABLE {TABLE} (id BIGINT PRIMARY KEY AUTO_INCREMENT, "
+        f"ts_code VARCHAR(20) NOT NULL, trade_date VARCHAR(8) NOT NULL, "
+        + ', '.join(f"{col} DECIMAL(15, 4)" for col in factor_columns)
+        + ", UNIQUE KEY uk_ts_code_trade_date (ts_code, trade_date))"
+    )
+    cursor.close()
+
+    first, second = make_rows(args.rows, args.cols, 1), make_rows(args.rows, args.cols, 2)
+    print(f"{args.rows} 行 × {len(columns)} 列")
+
+    try:
+        for name, method in (('INSERT', writer.write), ('LOAD DATA', writer.load)):
+            with conn.cursor() as c:
+                c.execute(f"TRUNCATE TABLE {TABLE}")
+            insert_seconds, _ = timed(conn, method, first)
+            upsert_seconds, _ = timed(conn, method, second)
+            print(f"{name:<10} 首次导入 {insert_seconds:7.2f}s   全量upsert {upsert_seconds:7.2f}s")
+    finally:
+        with conn.cursor() as c:
+            c.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
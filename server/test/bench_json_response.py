@@ -0,0 +1,79 @@
+"""
+JSON响应序列化基准：FastAPI 默认路径（jsonable_encoder + JSONResponse）与 FastJSONResponse（orjson）对比
+
+构造与 /b1-signal/filter-and-tag 结果结构相同的数据（b1_signal_results 的列，数值为numpy标量，
+金额为Decimal，标签为列表），分别测量按记录输出和按列输出（frame_columns）的序列化耗时。
+
+用法（在server目录下）：PYTHONPATH=. python test/bench_json_response.py --rows 5000
+"""
+import argparse
+import time
+from decimal import Decimal
+import numpy as np
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from core.responses import FastJSONResponse, frame_columns
+from services.b1_signal_service import B1_RESULT_COLUMNS
+
+TEXT_COLUMNS = ('ts_code', 'stock_name', 'trade_date', 'signal_strength', 'industry', 'area')
+INT_COLUMNS = ('volume', 'plus_tags_count', 'minus_tags_count')
+LIST_COLUMNS = ('matched_tag_ids', 'matched_tag_names', 'matched_tag_codes')
+
+
+def make_frame(rows: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    data = {}
+    for col in B1_RESULT_COLUMNS:
+        if col in TEXT_COLUMNS:
+            data[col] = [f"{col}_{i % 300}" for i in range(rows)]
+        elif col in INT_COLUMNS:
+            data[col] = rng.integers(0, 1_000_000, rows)
+        elif col in LIST_COLUMNS:
+            data[col] = [[f"tag_{j}" for j in range(i % 5)] for i in range(rows)]
+        elif col == 'amount':
+            data[col] = [Decimal(f"{v:.2f}") for v in rng.random(rows) * 1e6]
+        else:
+            values = np.round(rng.normal(size=rows) * 10, 4)
+            values[rng.random(rows) < 0.05] = np.nan
+            data[col] = values
+    return pd.DataFrame(data)
+
+
+def timed(func, repeat: int):
+    best = float('inf')
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = len(func())
+        best = min(best, time.perf_counter() - start)
+    return best, size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    df = make_frame(args.rows, seed=1)
+    records = df.replace({np.nan: None}).to_dict('records')
+    payload = {'success': True, 'total': len(records), 'data': records}
+
+    cases = [
+        ('jsonable_encoder + JSONResponse', lambda: JSONResponse(jsonable_encoder(payload)).body),
+        ('FastJSONResponse 按记录', lambda: FastJSONResponse(payload).body),
+        ('FastJSONResponse 按列', lambda: FastJSONResponse(
+            {'success': True, 'total': len(df), 'data': frame_columns(df)}).body),
+    ]
+
+    print(f"{args.rows} 行 × {len(df.columns)} 列，取{args.repeat}次最优")
+    baseline = None
+    for name, func in cases:
+        seconds, size = timed(func, args.repeat)
+        baseline = baseline or seconds
+        print(f"{name:<32} {seconds * 1000:8.1f} ms  {size / 1024:8.0f} KB  {baseline / seconds:5.1f}x")
+
+
+if __name__ == '__main__':
+    main()
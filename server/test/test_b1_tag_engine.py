@@ -0,0 +1,366 @@
+"""
+B1TagEngine 与原逐只计算版本的一致性测试
+
+下面的 ref_* 函数是列式引擎上线前 B1SignalService.calc_* 的逐只实现（判定逻辑原样保留），
+作为对照：同一批股票经 calculate_tags 得到的 matched_tag_codes 和 tag_score 必须与其一致。
+
+运行：cd server && python -m pytest test/test_b1_tag_engine.py
+"""
+import math
+from datetime import date, timedelta
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.b1_signal_service import B1SignalService
+from services.b1_tag_engine import B1TagEngine, HistoryMatrix
+
+TRADE_DATE = '20240201'
+WINDOW = 20
+
+
+# ---------------------------------------------------------------------------
+# 对照实现：原 B1SignalService.calc_*
+#
+# 原实现用 int() 截断成交量，遇到缺失成交量（NaN）会直接抛 ValueError。
+# 这里换成 _int / _max：有限值的结果与 int() / max() 相同，NaN 原样传递，
+# 与引擎一致地让涉及缺失成交量的比较不成立。
+# ---------------------------------------------------------------------------
+
+def _int(value) -> float:
+    value = float(value)
+    return value if math.isnan(value) else int(value)
+
+
+def _max(values: List[float]) -> float:
+    return math.nan if any(math.isnan(v) for v in values) else max(values)
+
+
+def ref_minus_down1(history: List[Dict]) -> bool:
+    if len(history) < 10:
+        return False
+    recent_10_days = history[-10:]
+    for idx, current_day in enumerate(recent_10_days):
+        global_idx = len(history) - 10 + idx
+        current_pct = float(current_day.get('pct_change', 0))
+        current_volume = _int(current_day.get('vol', 0))
+        if current_pct >= 0:
+            continue
+        if global_idx < 5:
+            continue
+        pre_5_volumes = [_int(d.get('vol', 0)) for d in history[global_idx - 5: global_idx]]
+        if not pre_5_volumes:
+            continue
+        if current_volume >= _max(pre_5_volumes):
+            return True
+    return False
+
+
+def ref_minus_down2(history: List[Dict]) -> bool:
+    if len(history) < 2:
+        return False
+    for idx, current_day in enumerate(history):
+        if idx < 1:
+            continue
+        current_pct = float(current_day.get('pct_change', 0))
+        current_volume = _int(current_day.get('vol', 0))
+        if current_pct < 9.8:
+            continue
+        prev_day_volume = _int(history[idx - 1].get('vol', 0))
+        if current_volume <= prev_day_volume * 0.5:
+            return True
+    return False
+
+
+def ref_up1_red_fat_green_thin(history: List[Dict]) -> bool:
+    if len(history) < 2:
+        return False
+    recent_10 = history[-10:] if len(history) >= 10 else history
+    trend_data = [
+        {'trend': 'up' if float(item.get('pct_change', 0)) > 0 else 'down', 'volume': float(item.get('vol', 0))}
+        for item in recent_10
+    ]
+    for i, curr in enumerate(trend_data):
+        if curr['trend'] != 'up':
+            continue
+        prev_down = next((trend_data[j] for j in range(i - 1, -1, -1) if trend_data[j]['trend'] == 'down'), None)
+        next_down = next((trend_data[j] for j in range(i + 1, len(trend_data)) if trend_data[j]['trend'] == 'down'), None)
+        if prev_down and curr['volume'] <= prev_down['volume']:
+            return False
+        if next_down and curr['volume'] <= next_down['volume']:
+            return False
+    return True
+
+
+def ref_up2_shrink_after_divergence(history: List[Dict]) -> bool:
+    if len(history) < 2:
+        return False
+    today_amt = float(history[-1].get('amount', 0))
+    prev_amt = float(history[-2].get('amount', 0))
+    return prev_amt > 0 and today_amt <= prev_amt * 0.5
+
+
+def ref_up3_small_candle(current_pct: float) -> bool:
+    return -2 <= current_pct <= 1.8
+
+
+def ref_up4_recent_abnormal(history: List[Dict]) -> bool:
+    if len(history) < 2:
+        return False
+    recent_10 = history[-10:] if len(history) >= 10 else history
+    for i in range(1, len(recent_10)):
+        curr_pct = float(recent_10[i].get('pct_change', 0))
+        curr_vol = float(recent_10[i].get('vol', 0))
+        prev_vol = float(recent_10[i - 1].get('vol', 0))
+        if curr_pct >= 6.0 and prev_vol > 0 and curr_vol >= prev_vol * 1.5:
+            return True
+    return False
+
+
+def ref_up5_double_volume_red(history: List[Dict]) -> bool:
+    if len(history) < 2:
+        return False
+    recent_10 = history[-10:] if len(history) >= 10 else history
+    for i in range(1, len(recent_10)):
+        if float(recent_10[i].get('pct_change', 0)) <= 0:
+            continue
+        curr_vol = float(recent_10[i].get('vol', 0))
+        prev_vol = float(recent_10[i - 1].get('vol', 0))
+        if prev_vol > 0 and curr_vol >= prev_vol * 1.8:
+            return True
+    return False
+
+
+def ref_up6_swing_appropriate(ts_code: str, swing: float) -> bool:
+    swing_float = float(swing) if swing else 0.0
+    if ts_code.startswith('600'):
+        return swing_float <= 4.0
+    elif ts_code.startswith(('000', '300', '688')):
+        return swing_float <= 7.0
+    return False
+
+
+def ref_up7_market_cap_appropriate(total_mv: float) -> bool:
+    total_mv_float = float(total_mv) if total_mv else 0.0
+    return total_mv_float >= 800000
+
+
+def ref_high_vol(current_amount: float, history: List[Dict]) -> bool:
+    if len(history) < 10:
+        return False
+    amounts = [d.get('amount', 0) for d in history[-10:]]
+    return current_amount >= max(amounts) * 0.8
+
+
+def ref_break_ma(ts_code: str, close_price: float, ma_lookup: pd.DataFrame) -> bool:
+    if ts_code not in ma_lookup.index or pd.isna(ma_lookup.loc[ts_code, 'ma20']):
+        return False
+    return close_price < ma_lookup.loc[ts_code, 'ma20']
+
+
+def reference_tags(row: Dict, history: List[Dict], ma_lookup: pd.DataFrame, tag_config: Dict):
+    """按原 calculate_tags 的逐只流程计算 (matched_tag_codes, tag_score)"""
+    ts_code = row['ts_code']
+    checks = {
+        'up1': lambda: ref_up1_red_fat_green_thin(history),
+        'up2': lambda: ref_up2_shrink_after_divergence(history),
+        'up3': lambda: ref_up3_small_candle(row['pct_change']),
+        'up4': lambda: ref_up4_recent_abnormal(history),
+        'up5': lambda: ref_up5_double_volume_red(history),
+        'up6': lambda: ref_up6_swing_appropriate(ts_code, row['swing']),
+        'up7': lambda: ref_up7_market_cap_appropriate(row['total_mv']),
+        'high_vol': lambda: ref_high_vol(row['amount'], history),
+        'break_ma': lambda: ref_break_ma(ts_code, row['close_price'], ma_lookup),
+        'down1': lambda: ref_minus_down1(history),
+        'down2': lambda: ref_minus_down2(history),
+    }
+
+    codes = [tag['tag_code'] for tag in tag_config['filter_tags']]
+    plus_count = len(codes)
+    minus_count = 0
+    for tag in tag_config['plus_tags']:
+        if checks[tag['tag_code']]():
+            codes.append(tag['tag_code'])
+            plus_count += 1
+    for tag in tag_config['minus_tags']:
+        if checks[tag['tag_code']]():
+            codes.append(tag['tag_code'])
+            minus_count += 1
+    return codes, plus_count - minus_count
+
+
+# ---------------------------------------------------------------------------
+# 测试数据
+# ---------------------------------------------------------------------------
+
+def _tag(tag_id: int, code: str, is_filter: bool = False) -> Dict:
+    return {'id': tag_id, 'tag_code': code, 'tag_name': code, 'is_filter': is_filter, 'sort_order': tag_id}
+
+
+TAG_CONFIG = {
+    'filter_tags': [_tag(1, 'j_lt_13_qfq', True), _tag(2, 'macd_dif_gt_0_qfq', True)],
+    'plus_tags': [_tag(10 + i, f'up{i}') for i in range(1, 8)],
+    'minus_tags': [_tag(20, 'high_vol'), _tag(21, 'break_ma'), _tag(22, 'down1'), _tag(23, 'down2')],
+}
+ENGINE_TAGS = [tag['tag_code'] for tag in TAG_CONFIG['plus_tags'] + TAG_CONFIG['minus_tags']]
+
+
+def _dates(n: int) -> List[str]:
+    end = date(2024, 2, 1)
+    return [(end - timedelta(days=n - 1 - i)).strftime('%Y%m%d') for i in range(n)]
+
+
+def _history(ts_code: str, pct: List[float], vol: List[float], amount: List[float] = None) -> List[Dict]:
+    amount = amount if amount is not None else [v * 10 for v in vol]
+    return [
+        {'ts_code': ts_code, 'trade_date': d, 'pct_change': p, 'vol': v, 'amount': a}
+        for d, p, v, a in zip(_dates(len(pct)), pct, vol, amount)
+    ]
+
+
+def _handcrafted() -> Dict[str, List[Dict]]:
+    return {
+        # 红肥绿瘦：上涨日放量、下跌日缩量
+        '600001.SH': _history('600001.SH', [1.0, -0.5] * 6, [200, 100] * 6),
+        # 最近10日内下跌且成交量>=前5日最大
+        '000002.SZ': _history('000002.SZ', [0.5] * 12 + [-1.0] + [0.3] * 2, [100] * 12 + [150] + [90] * 2),
+        # 涨停但缩量一半以上（20日窗口边缘）
+        '300003.SZ': _history('300003.SZ', [0.2, 10.0] + [0.1] * 18, [400, 150] + [300] * 18),
+        # 异动 + 倍量红柱
+        '688004.SH': _history('688004.SH', [0.1] * 8 + [7.0, 0.5], [100] * 8 + [200, 120]),
+        # 当日成交额腰斩
+        '000005.SZ': _history('000005.SZ', [0.5] * 10, [100] * 10, [1000] * 9 + [400]),
+        # 高位放量
+        '600006.SH': _history('600006.SH', [0.5] * 11, [100] * 11, [1000] * 10 + [950]),
+        # 成交量为0（前一日为0时倍量/异动不成立，涨停日与前一日都为0时缩量成立）
+        '000007.SZ': _history('000007.SZ', [0.0, 11.0, 6.5, -3.0] * 3, [0, 0, 0, 50] * 3),
+        # 成交量缺失
+        '300008.SZ': _history('300008.SZ', [1.0, -1.0, 10.0, 0.5] * 3, [np.nan, 100, 40, np.nan] * 3),
+        # 只有1天历史
+        '000009.SZ': _history('000009.SZ', [1.0], [100]),
+        # 600010.SH：没有历史数据
+        # 9日历史：不足10日的标签不判定
+        '600011.SH': _history('600011.SH', [-1.0, 0.5] * 4 + [-2.0], [100, 120] * 4 + [500]),
+        # 涨跌幅缺失
+        '000012.SZ': _history('000012.SZ', [np.nan, 1.0, np.nan, 6.0] * 3, [100, 150, 80, 200] * 3),
+    }
+
+
+def _random_histories(rng: np.random.Generator, count: int) -> Dict[str, List[Dict]]:
+    histories = {}
+    prefixes = ['600', '000', '300', '688', '002']
+    for i in range(count):
+        ts_code = f"{prefixes[i % len(prefixes)]}{100 + i:03d}.{'SH' if i % 2 else 'SZ'}"
+        length = int(rng.integers(0, WINDOW + 1))
+        pct = rng.choice([-3.0, -1.0, 0.0, 0.5, 2.0, 6.5, 10.0], size=length)
+        vol = rng.choice([0.0, 50.0, 50.4, 50.8, 100.0, 180.0, 400.0], size=length)
+        amount = vol * rng.uniform(8, 12, size=length)
+        if length and i % 7 == 0:
+            vol[rng.integers(0, length)] = np.nan
+        histories[ts_code] = _history(ts_code, list(pct), list(vol), list(amount))
+    return histories
+
+
+@pytest.fixture(scope='module')
+def fixture_data():
+    histories = _handcrafted()
+    histories.update(_random_histories(np.random.default_rng(20240201), 60))
+
+    ts_codes = list(histories) + ['600010.SH']
+    rows = []
+    for i, ts_code in enumerate(ts_codes):
+        history = histories.get(ts_code, [])
+        last = history[-1] if history else {'pct_change': 0.3, 'amount': 500.0, 'vol': 50.0}
+        rows.append({
+            'ts_code': ts_code, 'name': ts_code, 'trade_date': TRADE_DATE,
+            'close_price': 10.0 + i % 5, 'open_price': 10.0, 'high_price': 11.0, 'low_price': 9.0,
+            'price_change': 0.1, 'pct_change': last['pct_change'], 'vol': last['vol'], 'amount': last['amount'],
+            'vol_ratio': 2.5 if i % 3 else 1.0, 'turn_over': 1.0,
+            'kdj_qfq': 5.0, 'kdj_k_qfq': 10.0, 'kdj_d_qfq': 12.0,
+            'macd_dif_qfq': 0.1, 'macd_dea_qfq': 0.05, 'macd_qfq': 0.1,
+            'total_mv': [None, 500000.0, 800000.0, 1200000.0][i % 4], 'float_mv': 400000.0,
+            'industry': '测试', 'area': '测试',
+            'swing': [None, 3.5, 4.5, 6.9, 7.5, np.nan][i % 6],
+        })
+    df = pd.DataFrame(rows)
+
+    # ma20 覆盖：高于收盘价、低于收盘价、缺失值、无均线记录
+    ma_codes = ts_codes[::2]
+    ma20 = [[12.5, 9.0, np.nan][k % 3] for k in range(len(ma_codes))]
+    ma_lookup = pd.DataFrame({'ma5': 1.0, 'ma10': 1.0, 'ma20': ma20, 'ma30': 1.0},
+                             index=pd.Index(ma_codes, name='ts_code'))
+
+    # 与原 calculate_tags 一样逐行读取 DataFrame（缺失值此时已是NaN）
+    expected = {
+        row['ts_code']: reference_tags(row, histories.get(row['ts_code'], []), ma_lookup, TAG_CONFIG)
+        for _, row in df.iterrows()
+    }
+    return df, histories, ma_lookup, expected
+
+
+def _frame(histories: Dict[str, List[Dict]]) -> pd.DataFrame:
+    return pd.DataFrame([record for history in histories.values() for record in history])
+
+
+# ---------------------------------------------------------------------------
+# 测试
+# ---------------------------------------------------------------------------
+
+def test_fixture_covers_every_tag(fixture_data):
+    _, _, _, expected = fixture_data
+    for code in ENGINE_TAGS:
+        hits = [code in codes for codes, _ in expected.values()]
+        assert any(hits), f"{code} 在测试数据中从未触发"
+        assert not all(hits), f"{code} 在测试数据中总是触发"
+
+
+@pytest.mark.parametrize('history_source', ['frame', 'records'])
+def test_calculate_tags_matches_reference(fixture_data, history_source):
+    df, histories, ma_lookup, expected = fixture_data
+    stock_history = _frame(histories) if history_source == 'frame' else histories
+
+    result = B1SignalService().calculate_tags(df, stock_history, TAG_CONFIG, ma_lookup=ma_lookup)
+
+    assert result['ts_code'].tolist() == df['ts_code'].tolist()
+    for row in result.itertuples(index=False):
+        codes, score = expected[row.ts_code]
+        assert row.matched_tag_codes == codes, row.ts_code
+        assert row.tag_score == score, row.ts_code
+
+
+def test_engine_matches_reference_per_tag(fixture_data):
+    df, histories, ma_lookup, expected = fixture_data
+    history = HistoryMatrix.from_frame(_frame(histories), df['ts_code'].tolist(), window=WINDOW)
+    engine = B1TagEngine(df, history, ma_lookup)
+
+    for code in ENGINE_TAGS:
+        actual = engine.evaluate(code)
+        want = np.array([code in expected[ts_code][0] for ts_code in df['ts_code']])
+        mismatched = df['ts_code'][actual != want].tolist()
+        assert not mismatched, f"{code}: {mismatched}"
+
+
+def test_short_and_missing_history(fixture_data):
+    df, histories, ma_lookup, _ = fixture_data
+    history = HistoryMatrix.from_records(histories, df['ts_code'].tolist(), window=WINDOW)
+    engine = B1TagEngine(df, history, ma_lookup)
+
+    position = {ts_code: i for i, ts_code in enumerate(df['ts_code'])}
+    lengths = dict(zip(df['ts_code'], history.lengths))
+    assert lengths['000009.SZ'] == 1
+    assert lengths['600010.SH'] == 0
+    assert lengths['600011.SH'] == 9
+
+    for ts_code in ('000009.SZ', '600010.SH'):
+        for code in ('up1', 'up2', 'up4', 'up5', 'high_vol', 'down1', 'down2'):
+            assert not engine.evaluate(code)[position[ts_code]], (ts_code, code)
+    for code in ('high_vol', 'down1'):
+        assert not engine.evaluate(code)[position['600011.SH']], code
+
+
+def test_unknown_tag_is_never_matched(fixture_data):
+    df, histories, ma_lookup, _ = fixture_data
+    history = HistoryMatrix.from_records(histories, df['ts_code'].tolist(), window=WINDOW)
+    assert not B1TagEngine(df, history, ma_lookup).evaluate('ma_bull').any()
@@ -0,0 +1,74 @@
+"""
+条件GET在 /b1-signal/stock-detail 上的测试
+
+该接口直接返回 Response 对象，conditional_get 写入的 ETag 等响应头需要由接口自行带上。
+数据库访问（数据写入时间、个股详情查询）以固定结果替换。
+
+运行：cd server && python -m pytest test/test_conditional_get.py
+"""
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import api.dependencies as dependencies
+from api.v1.endpoints import b1_signal
+from core.cache import bump_data_version
+from core.config import settings
+
+DETAIL = {'success': True, 'data': {'ts_code': '000001.SZ', 'time': ['2024-02-01'], 'close': [10.5]}}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    async def load_data_stamp():
+        return '2024-02-01 20:40:00|None', datetime(2024, 2, 1, 20, 40)
+
+    calls = []
+
+    def run_get_stock_detail(code, start, end, limit, since):
+        calls.append(code)
+        return DETAIL, b1_signal.dumps(DETAIL)
+
+    monkeypatch.setattr(settings, 'CONDITIONAL_GET_ENABLED', True)
+    monkeypatch.setattr(dependencies, '_load_data_stamp', load_data_stamp)
+    monkeypatch.setattr(b1_signal, '_run_get_stock_detail', run_get_stock_detail)
+    bump_data_version()
+
+    app = FastAPI()
+    app.include_router(b1_signal.router, prefix='/b1-signal')
+    with TestClient(app) as test_client:
+        test_client.detail_calls = calls
+        yield test_client
+
+
+def test_stock_detail_sends_validators(client):
+    response = client.get('/b1-signal/stock-detail', params={'code': '000001.SZ'})
+
+    assert response.status_code == 200
+    assert response.json() == DETAIL
+    assert response.headers['etag'].startswith('W/"')
+    assert response.headers['cache-control'] == 'no-cache'
+    assert 'last-modified' in response.headers
+
+
+def test_stock_detail_revalidates_with_etag(client):
+    first = client.get('/b1-signal/stock-detail', params={'code': '000001.SZ'})
+    calls = len(client.detail_calls)
+
+    second = client.get('/b1-signal/stock-detail', params={'code': '000001.SZ'},
+                        headers={'If-None-Match': first.headers['etag']})
+
+    assert second.status_code == 304
+    assert second.headers['etag'] == first.headers['etag']
+    assert len(client.detail_calls) == calls
+
+
+def test_stock_detail_etag_differs_per_code(client):
+    first = client.get('/b1-signal/stock-detail', params={'code': '000001.SZ'})
+    other = client.get('/b1-signal/stock-detail', params={'code': '600000.SH'},
+                       headers={'If-None-Match': first.headers['etag']})
+
+    assert other.status_code == 200
+    assert other.headers['etag'] != first.headers['etag']
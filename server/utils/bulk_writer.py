@@ -0,0 +1,197 @@
+import os
+import tempfile
+from typing import Dict, Iterable, List, Optional, Sequence
+import numpy as np
+import pandas as pd
+from utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def _tsv_column(values: Sequence) -> np.ndarray:
+    """单列值编码为 LOAD DATA 默认格式（\\N 表示NULL，转义反斜杠/制表符/换行）"""
+    values = np.asarray(values, dtype=object)
+    missing = np.fromiter((v is None for v in values), dtype=bool, count=len(values))
+    is_bool = np.fromiter((isinstance(v, (bool, np.bool_)) for v in values), dtype=bool, count=len(values))
+    if is_bool.any():
+        values = values.copy()
+        values[is_bool] = values[is_bool].astype(int)
+    text = pd.Series(values.astype(str), dtype=object)
+    first = next((v for v in values if v is not None), None)
+    if isinstance(first, str):
+        text = (text.str.replace('\\', '\\\\', regex=False)
+                    .str.replace('\t', '\\t', regex=False)
+                    .str.replace('\n', '\\n', regex=False)
+                    .str.replace('\r', '\\r', regex=False))
+    encoded = text.to_numpy(dtype=object)
+    encoded[missing] = '\\N'
+    return encoded
+
+
+def write_tsv(rows: List[tuple], path: str):
+    """
+    将行元组写为 LOAD DATA INFILE 可直接读取的TSV文件
+
+    Args:
+        rows: 行元组（None 表示NULL）
+        path: 文件路径
+    """
+    columns = [_tsv_column(col) for col in zip(*rows)] if rows else []
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        for start in range(0, len(rows), 10000):
+            chunk = zip(*(col[start:start + 10000] for col in columns))
+            f.write(''.join('\t'.join(row) + '\n' for row in chunk))
+
+
+def frame_to_rows(df: pd.DataFrame, columns: Sequence[str]) -> List[tuple]:
+    """
+    将DataFrame按列数组转为参数元组列表（不逐行构造Series）
+
+    缺失的列取None；NaN/NA/inf 转为None；numpy标量转为Python原生类型。
+
+    Args:
+        df: 数据
+        columns: 输出列及顺序
+
+    Returns:
+        行元组列表
+    """
+    n = len(df)
+    arrays = []
+    for col in columns:
+        if col not in df.columns:
+            arrays.append(np.full(n, None, dtype=object))
+            continue
+
+        series = df[col]
+        if pd.api.types.is_float_dtype(series.dtype):
+            numbers = series.to_numpy(dtype=float, na_value=np.nan)
+            values = numbers.astype(object)
+            values[~np.isfinite(numbers)] = None
+        elif pd.api.types.is_bool_dtype(series.dtype) and not pd.api.types.is_extension_array_dtype(series.dtype):
+            values = series.to_numpy().astype(object)
+        elif pd.api.types.is_integer_dtype(series.dtype) and not pd.api.types.is_extension_array_dtype(series.dtype):
+            values = series.to_numpy().astype(object)
+        else:
+            values = series.to_numpy(dtype=object, na_value=None)
+            values[pd.isna(values)] = None
+        arrays.append(values)
+
+    return list(zip(*arrays)) if arrays else [()] * n
+
+
+class BulkWriter:
+    """
+    多行 INSERT（可选 ON DUPLICATE KEY UPDATE）批量写入器
+
+    SQL模板按批大小缓存，同一写入器的所有满批次共用一条模板，只在最后一个不满批次多生成一次。
+    """
+
+    def __init__(self, table: str, columns: Sequence[str], update_columns: Optional[Sequence[str]] = None,
+                 constants: Optional[Dict[str, str]] = None, batch_size: int = 500):
+        """
+        Args:
+            table: 表名
+            columns: 参数列（与行元组顺序一致）
+            update_columns: 主键冲突时更新的列，None表示普通INSERT
+            constants: 以SQL表达式写入的常量列，如 {'is_active': '1', 'trigger_time': 'NOW()'}
+            batch_size: 每条INSERT的行数
+        """
+        self.table = table
+        self.columns = list(columns)
+        self.constants = dict(constants or {})
+        self.update_columns = list(update_columns) if update_columns is not None else None
+        self.batch_size = batch_size
+        self._templates: Dict[int, str] = {}
+
+        all_columns = self.columns + list(self.constants)
+        self._head = f"INSERT INTO {table} ({', '.join(f'`{col}`' for col in all_columns)}) VALUES "
+        self._row = '(' + ', '.join(['%s'] * len(self.columns) + list(self.constants.values())) + ')'
+        self._tail = ''
+        if self.update_columns:
+            self._tail = ' ON DUPLICATE KEY UPDATE ' + ', '.join(
+                f"`{col}`=VALUES(`{col}`)" for col in self.update_columns
+            )
+
+    def sql(self, rows: int) -> str:
+        """rows 行的INSERT语句（按行数缓存）"""
+        template = self._templates.get(rows)
+        if template is None:
+            template = self._head + ','.join([self._row] * rows) + self._tail
+            self._templates[rows] = template
+        return template
+
+    def write(self, cursor, rows: Iterable[tuple]) -> int:
+        """
+        分批写入（不提交事务，由调用方commit/rollback）
+
+        Args:
+            cursor: DB-API游标
+            rows: 与 columns 顺序一致的行元组
+
+        Returns:
+            affected rows 合计（upsert时更新的行按MySQL约定计2）
+        """
+        rows = rows if isinstance(rows, list) else list(rows)
+        total = 0
+        for i in range(0, len(rows), self.batch_size):
+            batch = rows[i:i + self.batch_size]
+            cursor.execute(self.sql(len(batch)), [v for row in batch for v in row])
+            total += cursor.rowcount
+            logger.debug(f"{self.table} 批次{i // self.batch_size + 1}: 写入{len(batch)}条")
+        return total
+
+    def write_frame(self, cursor, df: pd.DataFrame) -> int:
+        """将DataFrame按 columns 写入"""
+        return self.write(cursor, frame_to_rows(df, self.columns))
+
+    def load(self, cursor, rows: Iterable[tuple], tmp_dir: str = None) -> int:
+        """
+        LOAD DATA LOCAL INFILE 批量导入（不提交事务，由调用方commit/rollback）
+
+        先将数据写入TSV临时文件并导入与目标表同结构的临时表，
+        再用一条 INSERT ... SELECT（可选 ON DUPLICATE KEY UPDATE）合并进目标表。
+        连接需开启 local_infile，服务端需允许 local_infile；不满足时抛出数据库异常，
+        由调用方回退到 write()。
+
+        Args:
+            cursor: DB-API游标
+            rows: 与 columns 顺序一致的行元组
+            tmp_dir: 临时文件目录，默认系统临时目录
+
+        Returns:
+            合并语句的 affected rows
+        """
+        rows = rows if isinstance(rows, list) else list(rows)
+        if not rows:
+            return 0
+
+        stage = f"{self.table}_stage"
+        fd, path = tempfile.mkstemp(prefix=f"{self.table}_", suffix='.tsv', dir=tmp_dir)
+        os.close(fd)
+        try:
+            write_tsv(rows, path)
+
+            cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {stage}")
+            cursor.execute(f"CREATE TEMPORARY TABLE {stage} LIKE {self.table}")
+            cursor.execute(
+                f"LOAD DATA LOCAL INFILE %s INTO TABLE {stage} CHARACTER SET utf8mb4 "
+                f"FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' "
+                f"({', '.join(f'`{col}`' for col in self.columns)})",
+                [path]
+            )
+            logger.debug(f"{self.table} 已导入临时表 {cursor.rowcount} 条")
+
+            all_columns = self.columns + list(self.constants)
+            select_list = [f"`{col}`" for col in self.columns] + list(self.constants.values())
+            cursor.execute(
+                f"INSERT INTO {self.table} ({', '.join(f'`{col}`' for col in all_columns)}) "
+                f"SELECT {', '.join(select_list)} FROM {stage}" + self._tail
+            )
+            return cursor.rowcount
+        finally:
+            try:
+                cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {stage}")
+            except Exception:
+                pass
+            os.unlink(path)